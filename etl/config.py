@@ -5,17 +5,22 @@ import yaml
 
 from .download_http import slug
 
+# libyaml-backed loader when available; identical semantics to SafeLoader
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class ConfigError(Exception):
     pass
 
 
 def _read_yaml(path: Path) -> dict:
-    if not path.exists():
-        raise ConfigError(f"Missing required config file: {path}")
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-    return data
+    # One read of the whole file (no separate exists() stat); the parser
+    # decodes UTF-8 from the buffer itself
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError as e:
+        raise ConfigError(f"Missing required config file: {path}") from e
+    return yaml.load(data, Loader=_YamlLoader) or {}
 
 
 def load_config(
@@ -56,6 +61,10 @@ def load_config(
     for i, source in enumerate(sources):
         processed_source = source.copy()
 
+        # Normalise the type once so downloaders can compare it directly
+        if isinstance(processed_source.get("type"), str):
+            processed_source["type"] = processed_source["type"].strip().lower()
+
         # Generate out_name from name if not provided
         if "out_name" not in processed_source:
             name = processed_source.get("name", f"source_{i}")
@@ -107,7 +116,7 @@ def _apply_bbox_inheritance(source: dict, defaults: dict) -> None:
     raw = source.setdefault("raw", {})
 
     # Use protocol-appropriate defaults. Never leak REST bbox (3006) into OGC.
-    src_type = (source.get("type") or "").lower()
+    src_type = source.get("type") or ""
 
     if src_type == "ogc":
         # Prefer OGC-specific defaults if available
@@ -12,6 +12,7 @@ import urllib.error
 import urllib.request
 import zipfile
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 # Suppress urllib3 warnings
@@ -27,14 +28,19 @@ CHAR_MAP = str.maketrans({
     "ß": "ss",
 })
 
+# Source types handled here (config.load_config lower-cases "type")
+_FILE_TYPES = frozenset({"file", "http"})
+
 SAFE_RE = re.compile(r"[^a-z0-9_\-]+")
+UNDERSCORES_RE = re.compile(r"_+")
 
+@lru_cache(maxsize=4096)
 def slug(s: str, maxlen: int = 63) -> str:
     """Create safe slug from string."""
     s = (s or "unnamed").strip().lower().translate(CHAR_MAP)
     s = s.replace(" ", "_")
     s = SAFE_RE.sub("_", s)
-    s = re.sub(r"_+", "_", s).strip("_")
+    s = UNDERSCORES_RE.sub("_", s).strip("_")
     return s[:maxlen] or "unnamed"
 
 
@@ -50,13 +56,11 @@ def run(cfg: dict) -> None:
 
     downloads_dir.mkdir(parents=True, exist_ok=True)
 
-    # Filter to only file/http sources
-    file_sources = []
-    for source in cfg.get("sources", []):
-        source_type = source.get("type", "").lower()
-        # Only handle plain file downloads, not specialized types
-        if source_type in ("file", "http") and source.get("enabled", True):
-            file_sources.append(source)
+    # Only handle plain file downloads, not specialized types
+    file_sources = [
+        s for s in cfg.get("sources", [])
+        if s.get("type") in _FILE_TYPES and s.get("enabled", True)
+    ]
 
     if not file_sources:
         log.info("[HTTP] No file/HTTP sources to process")
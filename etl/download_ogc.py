@@ -3,9 +3,11 @@ OGC API Features downloader for OP-ETL pipeline.
 Enhanced implementation with recursion depth protection and SR consistency.
 """
 
-import json
+import contextlib
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin
@@ -18,9 +20,66 @@ from .sr_utils import (
     log_sr_validation_summary,
     validate_sr_consistency,
 )
+from .utils import json_dumps_bytes
 
 log = logging.getLogger(__name__)
 
+# Hard cap on concurrent collection fetches per source, to stay polite to servers
+MAX_COLLECTION_WORKERS = 8
+
+# Back-off for throttled pages (429/503) that survive the client's own retries
+THROTTLE_STATUSES = (429, 503)
+MAX_THROTTLE_RETRIES = 3
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+# OGC API CRS URI for SWEREF99 TM (bbox-crs/crs parameters)
+SWEREF99_TM_CRS_URI = f"http://www.opengis.net/def/crs/EPSG/0/{SWEREF99_TM}"
+
+
+class _FeatureCollectionWriter:
+    """Append pages of features to a single GeoJSON FeatureCollection file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = open(path, "wb")
+        self._f.write(b'{"type":"FeatureCollection","features":[')
+        self._empty = True
+
+    def write(self, features: List[Dict]) -> None:
+        chunk = b",".join(json_dumps_bytes(f) for f in features)
+        if not self._empty:
+            self._f.write(b",")
+        self._f.write(chunk)
+        self._empty = False
+
+    def close(self) -> None:
+        self._f.write(b"]}")
+        self._f.close()
+
+    def abort(self) -> None:
+        """Close and remove a partially written file."""
+        with contextlib.suppress(Exception):
+            self._f.close()
+        with contextlib.suppress(Exception):
+            self.path.unlink()
+
+
+def _retry_after_seconds(response, default: float) -> Optional[float]:
+    """Seconds to wait before retrying a throttled response, or None if not throttled."""
+    if response.status_code not in THROTTLE_STATUSES:
+        return None
+    value = (response.headers.get("retry-after") or "").strip()
+    wait = default
+    if value:
+        try:
+            wait = float(value)
+        except ValueError:
+            try:
+                wait = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                pass
+    return min(max(wait, 0.0), MAX_RETRY_AFTER_SECONDS)
+
 
 def _extract_global_bbox(cfg: dict) -> Tuple[Optional[List[float]], Optional[str]]:
     """Read a global bbox for OGC from config.
@@ -68,6 +127,7 @@ def run(cfg: dict) -> None:
     """Process all OGC sources in configuration."""
     global_bbox, global_crs = _extract_global_bbox(cfg)
     delay_seconds = float(cfg.get("ogc_api_delay", 0.1) or 0)
+    max_workers = int(cfg.get("ogc_max_workers", 1) or 1)
     ogc_sources = []
     for source in cfg.get("sources", []):
         if source.get("type") == "ogc" and source.get("enabled", True):
@@ -89,7 +149,9 @@ def run(cfg: dict) -> None:
 
         try:
             log.info(f"[OGC] Processing {source['name']}")
-            success, feature_count = process_ogc_source(source, downloads_dir, global_bbox, global_crs, delay_seconds)
+            success, feature_count = process_ogc_source(
+                source, downloads_dir, global_bbox, global_crs, delay_seconds, max_workers
+            )
             end_monitoring_source(success, features=feature_count)  # Features counted in process_ogc_source
         except RecursionError as e:
             log.error(f"[OGC] Recursion error in {source['name']}: {e}")
@@ -109,7 +171,7 @@ def normalize_base_url(url: str) -> str:
 
 def process_ogc_source(source: Dict, downloads_dir: Path,
                        global_bbox: Optional[List[float]], global_crs: Optional[str],
-                       delay_seconds: float) -> Tuple[bool, int]:
+                       delay_seconds: float, max_workers: int = 1) -> Tuple[bool, int]:
     base_url = normalize_base_url(source["url"])
     authority = source["authority"]
     name = source["name"]
@@ -118,8 +180,15 @@ def process_ogc_source(source: Dict, downloads_dir: Path,
     out_dir = downloads_dir / authority / name
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    # Collections are independent paging loops, so they are fetched concurrently
+    workers = max(1, min(max_workers, MAX_COLLECTION_WORKERS))
+
+    # One pooled session per source so TCP/TLS connections are reused across
+    # discovery and every page of every collection
+    session = RecursionSafeSession(pool_maxsize=workers)
+
     # Discover collections
-    collections = discover_collections(base_url)
+    collections = discover_collections(base_url, session)
     if not collections:
         log.warning(f"[OGC] No collections discovered for {name}")
         return False, 0
@@ -141,8 +210,7 @@ def process_ogc_source(source: Dict, downloads_dir: Path,
     else:
         selected_ids = [c["id"] for c in collections]
 
-    total_features = 0
-    for cid in selected_ids:
+    def _fetch(cid: str) -> int:
         try:
             cnt = fetch_collection_items(
                 base_url,
@@ -152,11 +220,21 @@ def process_ogc_source(source: Dict, downloads_dir: Path,
                 global_bbox,
                 global_crs,
                 delay_seconds,
+                session,
             )
-            total_features += cnt
             log.info(f"[OGC] Collection {cid}: {cnt} features")
+            return cnt
         except Exception as e:
             log.warning(f"[OGC] Failed collection {cid}: {e}")
+            return 0
+
+    workers = min(workers, len(selected_ids)) or 1
+    if workers > 1:
+        log.info(f"[OGC] Fetching {len(selected_ids)} collections with {workers} workers")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ogc") as executor:
+            total_features = sum(executor.map(_fetch, selected_ids))
+    else:
+        total_features = sum(_fetch(cid) for cid in selected_ids)
 
     log.info(f"[OGC] Total features from {name}: {total_features}")
 
@@ -168,9 +246,9 @@ def process_ogc_source(source: Dict, downloads_dir: Path,
     return True, total_features
 
 
-def discover_collections(base_url: str) -> List[Dict]:
+def discover_collections(base_url: str, session: Optional[RecursionSafeSession] = None) -> List[Dict]:
     """Discover collections from OGC API with enhanced error handling."""
-    session = RecursionSafeSession()
+    session = session or RecursionSafeSession()
 
     try:
         url = urljoin(base_url + "/", "collections")
@@ -215,10 +293,11 @@ def discover_collections(base_url: str) -> List[Dict]:
 
 def fetch_collection_items(base_url: str, collection_id: str, out_dir: Path, raw: Dict,
                            global_bbox: Optional[List[float]], global_crs: Optional[str],
-                           delay_seconds: float) -> int:
+                           delay_seconds: float,
+                           session: Optional[RecursionSafeSession] = None) -> int:
     """Fetch collection items with enhanced error handling."""
     out_dir.mkdir(parents=True, exist_ok=True)
-    session = RecursionSafeSession()
+    session = session or RecursionSafeSession()
 
     url = urljoin(base_url.rstrip("/") + "/", f"collections/{collection_id}/items")
     page_size = int(raw.get("page_size", 1000) or 1000)
@@ -228,6 +307,8 @@ def fetch_collection_items(base_url: str, collection_id: str, out_dir: Path, raw
 
     # Check if server supports EPSG:3006 - define early to ensure it's always bound
     supports_3006 = raw.get("supports_epsg_3006", False)
+    # Opt in to checking every feature's coordinates on the first page, not just the first
+    sample_only = not raw.get("validate_all_coordinates", False)
 
     # Only add limit parameter if explicitly configured and not the default
     if raw.get("page_size") and raw.get("page_size") != 1000:
@@ -244,8 +325,8 @@ def fetch_collection_items(base_url: str, collection_id: str, out_dir: Path, raw
         params["bbox"] = ",".join(str(v) for v in bbox[:4])
         if supports_3006:
             # Explicitly request SWEREF99 TM when server supports it
-            params["bbox-crs"] = f"http://www.opengis.net/def/crs/EPSG/0/{SWEREF99_TM}"
-            params["crs"] = f"http://www.opengis.net/def/crs/EPSG/0/{SWEREF99_TM}"
+            params["bbox-crs"] = SWEREF99_TM_CRS_URI
+            params["crs"] = SWEREF99_TM_CRS_URI
             log.info(f"[OGC] Using EPSG:{SWEREF99_TM} for {collection_id}")
         else:
             # Do NOT send bbox-crs for CRS84; most servers assume CRS84 by default
@@ -254,14 +335,18 @@ def fetch_collection_items(base_url: str, collection_id: str, out_dir: Path, raw
     validation_results = {}
     total = 0
     page = 1
-    all_features: List[Dict] = []
+    # Pages are written out as they arrive so only one page is held in memory
+    out_file = out_dir / f"{collection_id}.geojson"
+    writer: Optional[_FeatureCollectionWriter] = None
     next_url: Optional[str] = url
     next_params = params.copy()
+    throttle_retries = 0
 
     try:
         log.info(f"[OGC] Fetching collection items: {collection_id}")
 
         while next_url:
+            started = time.monotonic()
             response = session.safe_get(
                 next_url,
                 params=next_params if next_url == url else None,
@@ -273,6 +358,18 @@ def fetch_collection_items(base_url: str, collection_id: str, out_dir: Path, raw
                 log.error(f"[OGC] Failed to fetch page {page} for {collection_id}")
                 break
 
+            # Only back off when the server asks us to
+            wait = _retry_after_seconds(response, default=max(delay_seconds, 1.0))
+            if wait is not None:
+                throttle_retries += 1
+                if throttle_retries > MAX_THROTTLE_RETRIES:
+                    log.error(f"[OGC] Still throttled (HTTP {response.status_code}) on page {page} of {collection_id}, giving up")
+                    break
+                log.warning(f"[OGC] Throttled (HTTP {response.status_code}) on page {page} of {collection_id}, retrying in {wait:.1f}s")
+                time.sleep(wait)
+                continue
+            throttle_retries = 0
+
             if not validate_response_content(response):
                 log.error(f"[OGC] Invalid response content for page {page} of {collection_id}")
                 break
@@ -285,14 +382,16 @@ def fetch_collection_items(base_url: str, collection_id: str, out_dir: Path, raw
             # Validate SR consistency on first page
             if page == 1:
                 expected_sr = SWEREF99_TM if supports_3006 else WGS84_DD
-                sr_valid, detected_sr = validate_sr_consistency(data, expected_sr)
+                sr_valid, detected_sr = validate_sr_consistency(data, expected_sr, sample_only=sample_only)
                 validation_results["sr_consistency"] = sr_valid
                 if not sr_valid:
                     log.warning(f"[OGC] SR validation failed for {collection_id} - expected {expected_sr}, detected {detected_sr}")
 
             features = data.get("features", [])
             if features:
-                all_features.extend(features)
+                if writer is None:
+                    writer = _FeatureCollectionWriter(out_file)
+                writer.write(features)
                 total += len(features)
                 log.debug(f"[OGC] Page {page}: {len(features)} features")
                 page += 1
@@ -305,9 +404,9 @@ def fetch_collection_items(base_url: str, collection_id: str, out_dir: Path, raw
             # Ensure CRS params are maintained across pagination (only when explicitly set)
             if next_url and supports_3006:
                 if "?" in next_url:
-                    next_url += f"&crs=http://www.opengis.net/def/crs/EPSG/0/{SWEREF99_TM}"
+                    next_url += f"&crs={SWEREF99_TM_CRS_URI}"
                 else:
-                    next_url += f"?crs=http://www.opengis.net/def/crs/EPSG/0/{SWEREF99_TM}"
+                    next_url += f"?crs={SWEREF99_TM_CRS_URI}"
 
             if not next_url:
                 break
@@ -317,16 +416,15 @@ def fetch_collection_items(base_url: str, collection_id: str, out_dir: Path, raw
                 log.warning("[OGC] Pagination exceeded 1000 pages, stopping.")
                 break
 
-            # Respect configured inter-request delay to be gentle on APIs
-            if delay_seconds and delay_seconds > 0:
-                time.sleep(delay_seconds)
-
-        # Write a single merged file per collection
-        if all_features:
-            out_file = out_dir / f"{collection_id}.geojson"
-            with open(out_file, "w", encoding="utf-8") as f:
-                json.dump({"type": "FeatureCollection", "features": all_features}, f, ensure_ascii=False, separators=(",", ":"))
+            # Pace requests to at most one per delay_seconds; slow responses
+            # already satisfy the interval so no extra idle time is added
+            remaining = delay_seconds - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
 
+        # Finish the single merged file per collection
+        if writer is not None:
+            writer.close()
             log.info(f"[OGC] Saved {total} features to {out_file.name}")
 
             # Log validation summary
@@ -337,17 +435,25 @@ def fetch_collection_items(base_url: str, collection_id: str, out_dir: Path, raw
 
     except RecursionError as e:
         log.error(f"[OGC] Recursion error fetching {collection_id}: {e}")
+        if writer is not None:
+            writer.abort()
         return 0
     except Exception as e:
         log.error(f"[OGC] Error fetching {collection_id}: {e}")
+        if writer is not None:
+            writer.abort()
         return 0
 
 
 def _find_next_link(links: List[Dict]) -> Optional[str]:
-    try:
-        for link in links or []:
-            if link.get("rel") == "next" and link.get("href"):
-                return link["href"]
-    except Exception:
-        pass
-    return None
+    """Return the href of the first rel="next" link, skipping malformed entries."""
+    if not isinstance(links, list):
+        return None
+    return next(
+        (
+            link["href"]
+            for link in links
+            if isinstance(link, dict) and link.get("rel") == "next" and link.get("href")
+        ),
+        None,
+    )
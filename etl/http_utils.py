@@ -32,6 +32,8 @@ from urllib3 import PoolManager
 from urllib3.util.retry import Retry
 from urllib3.util.timeout import Timeout
 
+from .utils import json_loads
+
 # --------------------------------------------------------------------------------------
 # Constants / defaults (match previous file names so other modules won't whine)
 # --------------------------------------------------------------------------------------
@@ -151,6 +153,7 @@ class HttpClient:
         connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
         read_timeout: float = DEFAULT_READ_TIMEOUT,
         num_pools: int = 20,
+        pool_maxsize: int = 1,
         headers: Optional[Dict[str, str]] = None,
         cfg: Optional[Dict[str, Any]] = None
     ) -> None:
@@ -164,6 +167,7 @@ class HttpClient:
             connect_timeout = float(cfg.get("http_connect_timeout", connect_timeout))
             read_timeout    = float(cfg.get("http_read_timeout", read_timeout))
             num_pools       = int(cfg.get("http_num_pools", num_pools))
+            pool_maxsize    = int(cfg.get("http_pool_maxsize", pool_maxsize))
 
         self.follow_redirects = follow_redirects
 
@@ -181,6 +185,7 @@ class HttpClient:
         self._timeout = Timeout(connect=connect_timeout, read=read_timeout)
         self._http: PoolManager = urllib3.PoolManager(
             num_pools=num_pools,
+            maxsize=pool_maxsize,
             retries=retry,
             timeout=self._timeout
         )
@@ -398,34 +403,21 @@ class HttpClient:
 def safe_json_parse(content: BytesLike, *, max_size_mb: int = 50, max_depth: int = MAX_JSON_DEPTH) -> Optional[Dict[str, Any]]:
     """Safely parse JSON with size and depth limits."""
     try:
-        text = _to_text(content)
-        if text is None:
+        # Work on the raw bytes; the parser decodes UTF-8 itself, so no str copy of the body
+        raw = _normalize_bytes(content)
+        if raw is None:
             log.warning("[JSON] Content is None")
             return None
 
-        if not text.strip():
+        if not raw or raw.isspace():
             log.warning("[JSON] Content is empty or whitespace-only")
             return None
 
-        if len(text) > max_size_mb * 1024 * 1024:
-            log.warning("[JSON] Content too large: %s bytes", len(text))
-            return None
-
-        # Parse with standard library
-        try:
-            data = json.loads(content)
-
-            # Validate depth after parsing
-            if _json_depth(data, 0, max_depth) > max_depth:
-                log.warning(f"[JSON] Exceeds maximum nesting depth of {max_depth}")
-                return None
-
-            return data
-        except json.JSONDecodeError as e:
-            log.error(f"[JSON] Parse error: {e}")
+        if _bytes_too_large(raw, max_size_mb):
+            log.warning("[JSON] Content too large: %s bytes", len(raw))
             return None
 
-        data = json.loads(text)
+        data = json_loads(raw)
 
         if _json_depth(data, 0, max_depth) > max_depth:
             log.warning("[JSON] Exceeds maximum nesting depth of %s", max_depth)
@@ -506,10 +498,11 @@ class RecursionSafeSession:
     Provides .safe_get(...) returning SimpleResponse like the old class.
     """
 
-    def __init__(self, max_retries: int = 3, backoff_factor: float = 0.5):
+    def __init__(self, max_retries: int = 3, backoff_factor: float = 0.5, pool_maxsize: int = 1):
         self._client = HttpClient(
             total_retries=max_retries,
             backoff_factor=backoff_factor,
+            pool_maxsize=pool_maxsize,
             follow_redirects=False,
             connect_timeout=DEFAULT_CONNECT_TIMEOUT,
             read_timeout=DEFAULT_READ_TIMEOUT,
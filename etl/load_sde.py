@@ -1,66 +1,62 @@
-import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional
+
+from .logging_config import install_queue_logging, worker_log_queue
+from .paths import processed_list_paths
+from .staging_index import get_staging_feature_classes
+from .utils import cached_exists, forget_exists, json_loads
+
+log = logging.getLogger(__name__)
+
+# Upper bound on concurrent SDE sessions regardless of config
+MAX_SDE_WORKERS = 4
+
+# Per-run memo of (shapeType, spatialReference) for staged templates; processing
+# may reproject a staged FC between runs, so run() clears it
+_template_describes: dict[str, tuple] = {}
 
 
 def run(cfg):
     """Load all staged feature classes to SDE."""
-    import arcpy  # lazy import
+    forget_exists()
+    _template_describes.clear()
     staging_gdb = cfg["workspaces"]["staging_gdb"]
     sde_conn = cfg["workspaces"].get("sde_conn")
 
     if not sde_conn:
-        logging.warning("[LOAD] No SDE connection configured")
+        log.warning("[LOAD] No SDE connection configured")
         return
 
-    # Load list of successfully processed feature classes
-    processed_file = Path(staging_gdb).parent / "processed_feature_classes.json"
-    successfully_processed = []
+    # Load list of successfully processed feature classes (None = no list, load all)
+    successfully_processed = _read_processed_list(staging_gdb)
 
+    # Staged feature classes (top level and feature datasets) as tuples of
+    # (full_path, relative_path, name); listed after the process step finished
     try:
-        if processed_file.exists():
-            with open(processed_file, 'r') as f:
-                successfully_processed = json.load(f)
-            logging.info(f"[LOAD] Found {len(successfully_processed)} successfully processed feature classes")
-        else:
-            logging.warning("[LOAD] No processed feature classes list found - will load all feature classes")
-    except (json.JSONDecodeError, IOError) as e:
-        logging.warning(f"[LOAD] Failed to load processed feature classes list ({type(e).__name__}): {e} - will load all feature classes")
-
-    # List actual feature classes in staging using arcpy.da.Walk
-    # Collect tuples of (full_path, relative_path, name)
-    feature_classes: list[tuple[str, str, str]] = []
-    try:
-        for dirpath, dirnames, filenames in arcpy.da.Walk(staging_gdb, datatype="FeatureClass"):
-            for name in filenames:
-                fc_path = f"{dirpath}/{name}"
-                rel_dir = dirpath[len(staging_gdb):] if str(dirpath).startswith(str(staging_gdb)) else ""
-                rel_dir = str(rel_dir).strip("/\\")
-                rel_path = f"{rel_dir}/{name}" if rel_dir else name
-                feature_classes.append((fc_path, rel_path, name))
+        feature_classes = get_staging_feature_classes(staging_gdb)
     except Exception as e:
-        logging.error(f"[LOAD] Cannot access staging GDB: {e}")
+        log.error(f"[LOAD] Cannot access staging GDB: {e}")
         return
 
     if not feature_classes:
-        logging.info("[LOAD] No feature classes found in staging")
+        log.info("[LOAD] No feature classes found in staging")
         return
 
     # Filter feature classes to only include successfully processed ones
-    # Gate on file existence so filtering always applies when the list is present
-    if processed_file.exists():
-        original_count = len(feature_classes)
-        excluded_feature_classes = [name for (_full, rel, name) in feature_classes if rel not in successfully_processed]
-        feature_classes = [(full, rel, name) for (full, rel, name) in feature_classes if rel in successfully_processed]
-        excluded_count = original_count - len(feature_classes)
-        if excluded_count > 0:
-            logging.info(f"[LOAD] Excluding {excluded_count} feature classes that were not successfully processed (no regional data)")
-            logging.info(f"[LOAD] Excluded feature classes: {excluded_feature_classes}")
-        logging.info(f"[LOAD] Loading {len(feature_classes)} feature classes with regional data")
+    # Filtering applies whenever a list file is present, even an empty one
+    processed_set = set(successfully_processed) if successfully_processed is not None else None
+    excluded_feature_classes: list[str] = []
 
-    loaded_count = 0
+    # Bucket sources by SDE destination so each destination is truncated once
+    # and loaded with a single multi-input Append (one transaction per target)
+    buckets: dict[str, tuple[str, list[str], list[str]]] = {}
 
     for src_fc, rel_fc, fc_name in feature_classes:
+        if processed_set is not None and rel_fc not in processed_set:
+            excluded_feature_classes.append(fc_name)
+            continue
 
         # Determine target feature dataset by authority prefix (before first underscore)
         authority = fc_name.split('_', 1)[0].upper() if '_' in fc_name else None
@@ -73,58 +69,148 @@ def run(cfg):
         # Resolve destination path: prefer dataset if it exists or can be created
         dest_fc = resolve_sde_destination(sde_conn, dataset_name, clean_fc_name, src_fc)
 
-        try:
-            if not arcpy.Exists(src_fc):
-                continue
+        # Listing already guarantees src_fc exists
+        _, sources, names = buckets.setdefault(dest_fc, (clean_fc_name, [], []))
+        sources.append(src_fc)
+        names.append(fc_name)
+
+    # performance.parallel_sde_loading: destinations are distinct and datasets
+    # were resolved above, so buckets can load concurrently, one process (own
+    # arcpy session) per worker; arcpy is not thread-safe, so never threads
+    perf = cfg.get("performance", {})
+    workers = 1
+    if perf.get("parallel_sde_loading", False):
+        workers = max(1, min(int(perf.get("parallel_workers", 1) or 1), MAX_SDE_WORKERS, len(buckets)))
+
+    if workers > 1:
+        log.info(f"[LOAD] Loading {len(buckets)} destinations with {workers} processes")
+        with worker_log_queue() as log_queue, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(log_queue, logging.getLogger().level)) as executor:
+            results = list(executor.map(_load_bucket, buckets.items()))
+    else:
+        results = map(_load_bucket, buckets.items())
 
-            success = load_to_sde(src_fc, dest_fc, clean_fc_name)
+    loaded_count = 0
+
+    for names, success, error in results:
+        if error is not None:
+            for fc_name in names:
+                log.error(f"[LOAD] ✗ {fc_name}: {error}")
+            continue
+        for fc_name in names:
             if success:
                 loaded_count += 1
-                logging.info(f"[LOAD] ✓ {fc_name}")
+                log.info(f"[LOAD] ✓ {fc_name}")
             else:
-                logging.warning(f"[LOAD] ✗ {fc_name} failed")
+                log.warning(f"[LOAD] ✗ {fc_name} failed")
 
-        except Exception as e:
-            logging.error(f"[LOAD] ✗ {fc_name}: {e}")
+    if excluded_feature_classes:
+        log.info(f"[LOAD] Excluded {len(excluded_feature_classes)} feature classes that were not successfully processed (no regional data)")
+        log.info(f"[LOAD] Excluded feature classes: {excluded_feature_classes}")
+    log.info(f"[LOAD] Loaded {loaded_count} feature classes to SDE")
 
-    logging.info(f"[LOAD] Loaded {loaded_count} feature classes to SDE")
+def _init_worker(log_queue, log_level: int = logging.NOTSET) -> None:
+    """Route a worker process's log records to the parent's queue listener."""
+    install_queue_logging(log_queue, log_level)
 
-def load_to_sde(src_fc: str, dest_fc: str, fc_name: str) -> bool:
-    """Load feature class to SDE with truncate-and-load strategy."""
+def _load_bucket(item: tuple) -> tuple[list[str], bool, Optional[str]]:
+    """Load one destination bucket; picklable so it can run in a worker process."""
+    dest_fc, (clean_fc_name, sources, names) = item
+    try:
+        return names, load_to_sde(sources, dest_fc, clean_fc_name), None
+    except Exception as e:
+        return names, False, str(e)
+
+def _read_processed_list(staging_gdb: str) -> Optional[list[str]]:
+    """Read the processed feature class list written by process.run.
+
+    Prefers the JSONL stream and falls back to the legacy JSON list. Returns
+    None when neither exists; an unreadable list yields [] so filtering still
+    applies whenever a list file is present.
+    """
+    processed_file, legacy_file = processed_list_paths(staging_gdb)
+    try:
+        if processed_file.exists():
+            with open(processed_file, 'rb') as f:
+                names = [json_loads(line) for line in f if line.strip()]
+        elif legacy_file.exists():
+            names = json_loads(legacy_file.read_bytes())
+        else:
+            log.warning("[LOAD] No processed feature classes list found - will load all feature classes")
+            return None
+    except (ValueError, IOError) as e:
+        log.warning(f"[LOAD] Failed to load processed feature classes list ({type(e).__name__}): {e} - will load all feature classes")
+        return []
+    log.info(f"[LOAD] Found {len(names)} successfully processed feature classes")
+    return names
+
+def load_to_sde(
+    src_fc: str | list[str],
+    dest_fc: str,
+    fc_name: str,
+    *,
+    shape_type: Optional[str] = None,
+    spatial_ref=None,
+) -> bool:
+    """Load feature class(es) to SDE with truncate-and-load strategy.
+
+    src_fc may be a list of staged feature classes sharing one destination;
+    they are appended in a single Append call, using the first as template.
+    shape_type/spatial_ref are only used if the destination must be created.
+    """
     import arcpy  # lazy import
     # Sanitize fc_name by removing file extension for SDE
     sde_fc_name = Path(fc_name).stem
+    sources = [src_fc] if isinstance(src_fc, str) else list(src_fc)
 
     try:
         if arcpy.Exists(dest_fc):
-            logging.info(f"[LOAD] Truncating existing SDE feature class: {sde_fc_name}")
+            log.info(f"[LOAD] Truncating existing SDE feature class: {sde_fc_name}")
             arcpy.management.TruncateTable(dest_fc)
         else:
-            logging.info(f"[LOAD] Creating new SDE feature class: {sde_fc_name}")
-            create_sde_fc(src_fc, dest_fc)
+            log.info(f"[LOAD] Creating new SDE feature class: {sde_fc_name}")
+            create_sde_fc(sources[0], dest_fc, shape_type=shape_type, spatial_ref=spatial_ref)
 
         # Append data
-        logging.info(f"[LOAD] Appending data to {sde_fc_name}")
+        log.info(f"[LOAD] Appending data to {sde_fc_name}")
         arcpy.management.Append(
-            inputs=src_fc,
+            inputs=sources,
             target=dest_fc,
             schema_type="NO_TEST"
         )
 
         return True
 
-    except arcpy.ExecuteError:
-        logging.error(f"[LOAD] Failed to load {sde_fc_name}: {arcpy.GetMessages(2)}")
+    except arcpy.ExecuteError as e:
+        # The exception carries the failing tool call's own messages; the global
+        # GetMessages() reflects whichever tool ran last in this process
+        log.error(f"[LOAD] Failed to load {sde_fc_name}: {e}")
         return False
     except Exception as e:
-        logging.error(f"[LOAD] An unexpected error occurred while loading {sde_fc_name}: {e}")
+        log.error(f"[LOAD] An unexpected error occurred while loading {sde_fc_name}: {e}")
         return False
 
-def create_sde_fc(template_fc: str, dest_fc: str):
-    """Create feature class in SDE using staging template."""
+def _describe_template(template_fc: str) -> tuple:
+    """Return (shapeType, spatialReference) of a staged template, described once per run."""
+    info = _template_describes.get(template_fc)
+    if info is None:
+        import arcpy  # lazy import
+        desc = arcpy.da.Describe(template_fc)
+        info = _template_describes[template_fc] = (desc["shapeType"], desc["spatialReference"])
+    return info
+
+def create_sde_fc(template_fc: str, dest_fc: str, *, shape_type: Optional[str] = None, spatial_ref=None):
+    """Create feature class in SDE using staging template.
+
+    Describes the template only for the properties not passed in.
+    """
     try:
         import arcpy  # lazy import
-        desc = arcpy.Describe(template_fc)
+        if shape_type is None or spatial_ref is None:
+            described_shape, described_sr = _describe_template(template_fc)
+            shape_type = shape_type or described_shape
+            spatial_ref = spatial_ref or described_sr
 
         # Extract workspace and feature class name
         sde_workspace = str(Path(dest_fc).parent)
@@ -133,13 +219,13 @@ def create_sde_fc(template_fc: str, dest_fc: str):
         arcpy.management.CreateFeatureclass(
             out_path=sde_workspace,
             out_name=fc_name,
-            geometry_type=desc.shapeType,
+            geometry_type=shape_type,
             template=template_fc,
-            spatial_reference=desc.spatialReference
+            spatial_reference=spatial_ref
         )
 
     except Exception as e:
-        logging.error(f"[LOAD] Failed to create SDE feature class: {e}")
+        log.error(f"[LOAD] Failed to create SDE feature class: {e}")
         raise
 
 def resolve_sde_destination(sde_conn: str, dataset_name: str | None, fc_name: str, template_fc: str) -> str:
@@ -152,14 +238,16 @@ def resolve_sde_destination(sde_conn: str, dataset_name: str | None, fc_name: st
         import arcpy  # lazy import
         if dataset_name:
             dataset_path = f"{sde_conn}/{dataset_name}"
-            if not arcpy.Exists(dataset_path):
+            # Many feature classes share one authority dataset; probe SDE once per run
+            if not cached_exists(dataset_path):
                 # Try to create feature dataset with same SR as template
                 try:
-                    sr = arcpy.Describe(template_fc).spatialReference
+                    _, sr = _describe_template(template_fc)
                     arcpy.management.CreateFeatureDataset(sde_conn, dataset_name, sr)
+                    forget_exists(dataset_path)
                 except Exception as e:
                     # If creation fails, log and fallback to root
-                    logging.warning(f"[LOAD] Could not create dataset {dataset_name}: {e}")
+                    log.warning(f"[LOAD] Could not create dataset {dataset_name}: {e}")
                     return f"{sde_conn}/{fc_name}"
 
             # If dataset exists now, place FC inside it
@@ -169,5 +257,5 @@ def resolve_sde_destination(sde_conn: str, dataset_name: str | None, fc_name: st
         return f"{sde_conn}/{fc_name}"
 
     except Exception as e:
-        logging.warning(f"[LOAD] Dataset resolution failed, loading to root: {e}")
+        log.warning(f"[LOAD] Dataset resolution failed, loading to root: {e}")
         return f"{sde_conn}/{fc_name}"
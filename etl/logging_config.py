@@ -1,17 +1,94 @@
 # stdlib only; works in ArcGIS Pro/Server envs
 from __future__ import annotations
 
+import contextlib
 import logging
 import logging.handlers
+import multiprocessing
+import os
+import threading
 from pathlib import Path
-from typing import Any, Mapping, Optional
+from typing import Any, Iterator, Mapping, Optional
 
 DEFAULT_FMT = "%(asctime)s - %(levelname)s - [%(name)s] %(message)s"
+DEFAULT_FLUSH_INTERVAL_SECONDS = 30.0
+DEFAULT_BUFFER_BYTES = 64 * 1024
+
+# Format fields that need LogRecord caller info (findCaller stack walk)
+_CALLER_FIELDS = ("pathname", "filename", "module", "lineno", "funcName")
+_DEFAULT_SRCFILE = logging._srcfile
+
+_flush_thread: Optional[threading.Thread] = None
+_flush_stop: Optional[threading.Event] = None
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+_log_queue: Any = None
+
+
+class _BufferedFileMixin:
+    """
+    Open the log file with a large write buffer.
+    StreamHandler flushes after every record; that is deferred for records
+    below WARNING so the buffer is drained by flush_logging() instead.
+    """
+    _defer_flush = False
+
+    def __init__(self, *args: Any, buffer_bytes: int = DEFAULT_BUFFER_BYTES, **kwargs: Any) -> None:
+        self.buffer_bytes = int(buffer_bytes) if buffer_bytes and buffer_bytes > 0 else -1
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_bytes,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._defer_flush = record.levelno < logging.WARNING
+        try:
+            super().emit(record)
+        finally:
+            self._defer_flush = False
+
+    def flush(self) -> None:
+        if not self._defer_flush:
+            super().flush()
+
+
+class BufferedFileHandler(_BufferedFileMixin, logging.FileHandler):
+    pass
+
+
+class BufferedRotatingFileHandler(_BufferedFileMixin, logging.handlers.RotatingFileHandler):
+    """
+    Track the file size in Python instead of asking the stream: the stock
+    shouldRollover calls stream.tell(), which flushes the write buffer on
+    every record. Sizes count characters, as the stock check does.
+    """
+    _size: Optional[int] = None
+    _regular = True
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.maxBytes <= 0:
+            return False
+        if self._size is None:
+            # Never roll over anything other than regular files (bpo-45401)
+            path = self.baseFilename
+            self._regular = not os.path.exists(path) or os.path.isfile(path)
+            self._size = os.path.getsize(path) if self._regular and os.path.exists(path) else 0
+        if not self._regular:
+            return False
+        length = len(self.format(record)) + 1  # terminator
+        if self._size + length >= self.maxBytes:
+            self._size = length  # doRollover follows; the record starts the new file
+            return True
+        self._size += length
+        return False
+
 
 def setup_logging(cfg: Optional[Mapping[str, Any]]) -> None:
     """
     Configure root logging from a dict (logging section from config.yaml).
     Idempotent: clears existing handlers to avoid duplicates.
+    With queue: true, handlers are driven by a QueueListener thread and the
+    root logger only enqueues; worker pools reuse that queue (worker_log_queue).
     """
     # Sensible fallbacks if cfg is None or partial
     cfg = cfg or {}
@@ -24,6 +101,9 @@ def setup_logging(cfg: Optional[Mapping[str, Any]]) -> None:
     debug_file = cfg.get("debug_file")       # e.g. logs/etl.debug.log
     max_mb = cfg.get("max_file_size_mb", 0)
     backup_count = int(cfg.get("backup_count", 5))
+    buffer_bytes = int(cfg.get("buffer_bytes", DEFAULT_BUFFER_BYTES) or 0)
+    flush_interval = float(cfg.get("flush_interval_seconds", DEFAULT_FLUSH_INTERVAL_SECONDS) or 0)
+    use_queue = bool(cfg.get("queue", False))
 
     # Root logger with permissive level based on configured handlers
     root = logging.getLogger()
@@ -40,6 +120,8 @@ def setup_logging(cfg: Optional[Mapping[str, Any]]) -> None:
     root.setLevel(effective_root)
 
     # Nuke old handlers to prevent duplicate lines across reruns
+    _stop_flush_thread()
+    _stop_queue_listener()
     for h in list(root.handlers):
         root.removeHandler(h)
         try:
@@ -49,11 +131,17 @@ def setup_logging(cfg: Optional[Mapping[str, Any]]) -> None:
 
     formatter = logging.Formatter(fmt)
 
+    # Skip the per-record findCaller walk unless the format actually uses it
+    if any(f"%({field})" in fmt for field in _CALLER_FIELDS):
+        logging._srcfile = _DEFAULT_SRCFILE
+    else:
+        logging._srcfile = None
+
     # Console handler
     ch = logging.StreamHandler()
     ch.setLevel(_coerce_level(console_level_name))
     ch.setFormatter(formatter)
-    root.addHandler(ch)
+    handlers: list[logging.Handler] = [ch]
 
     # Ensure logs directory exists if any file is requested
     files = [p for p in [summary_file, debug_file] if p]
@@ -62,28 +150,140 @@ def setup_logging(cfg: Optional[Mapping[str, Any]]) -> None:
 
     def make_file_handler(path: str, level: int) -> logging.Handler:
         if max_mb and max_mb > 0:
-            return logging.handlers.RotatingFileHandler(
-                path, maxBytes=int(max_mb * 1024 * 1024), backupCount=backup_count, encoding="utf-8"
+            return BufferedRotatingFileHandler(
+                path, maxBytes=int(max_mb * 1024 * 1024), backupCount=backup_count, encoding="utf-8",
+                buffer_bytes=buffer_bytes
             )
-        return logging.FileHandler(path, encoding="utf-8")
+        return BufferedFileHandler(path, encoding="utf-8", buffer_bytes=buffer_bytes)
 
     # Summary file (usually INFO/WARNING+)
     if summary_file:
         fh = make_file_handler(summary_file, _coerce_level(level_name))
         fh.setLevel(_coerce_level(level_name))
         fh.setFormatter(formatter)
-        root.addHandler(fh)
+        handlers.append(fh)
 
     # Debug file (full verbosity)
     if debug_file:
         dfh = make_file_handler(debug_file, logging.DEBUG)
         dfh.setLevel(logging.DEBUG)
         dfh.setFormatter(formatter)
-        root.addHandler(dfh)
+        handlers.append(dfh)
+
+    if use_queue:
+        _start_queue_listener(root, handlers)
+    else:
+        for h in handlers:
+            root.addHandler(h)
 
     # Don't let lib loggers spawn their own handlers
     _disable_library_basic_configs()
 
+    # Periodic flush so long-running phases still reach disk between boundaries
+    if flush_interval > 0:
+        _start_flush_thread(flush_interval)
+
+
+def flush_logging() -> None:
+    """
+    Flush every handler on the root logger.
+    Called at phase boundaries so mid-phase records are written in batches.
+    """
+    handlers = list(logging.getLogger().handlers)
+    if _queue_listener is not None:
+        handlers.extend(_queue_listener.handlers)
+    for h in handlers:
+        with contextlib.suppress(Exception):
+            h.flush()
+
+
+@contextlib.contextmanager
+def worker_log_queue() -> Iterator[Any]:
+    """
+    Yield a queue for a process pool's workers to log into (install_queue_logging
+    in the pool initializer). Reuses the queue: true listener, otherwise runs a
+    QueueListener on the root handlers for the duration of the block.
+    Flushes first, so forked workers don't inherit and rewrite buffered records.
+    """
+    flush_logging()
+    if _log_queue is not None:
+        yield _log_queue
+        return
+    log_queue = multiprocessing.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers,
+                                              respect_handler_level=True)
+    listener.start()
+    try:
+        yield log_queue
+    finally:
+        listener.stop()  # drains records the workers left in the queue
+
+
+def install_queue_logging(log_queue: Any, level: int = logging.NOTSET) -> None:
+    """
+    Route a worker process's root logger into the parent's log queue.
+    Intended as (part of) a ProcessPoolExecutor initializer.
+    """
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+
+def shutdown_logging() -> None:
+    """
+    Stop the periodic flush and the QueueListener (draining queued records),
+    then flush the remaining handlers. Call once when the pipeline exits.
+    """
+    _stop_flush_thread()
+    _stop_queue_listener()
+    flush_logging()
+
+
+def _start_queue_listener(root: logging.Logger, handlers: list[logging.Handler]) -> None:
+    global _queue_listener, _log_queue
+    _log_queue = multiprocessing.Queue(-1)
+    _queue_listener = logging.handlers.QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    root.addHandler(logging.handlers.QueueHandler(_log_queue))
+    _queue_listener.start()
+
+
+def _stop_queue_listener() -> None:
+    global _queue_listener, _log_queue
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for h in _queue_listener.handlers:
+            with contextlib.suppress(Exception):
+                h.close()
+        _queue_listener = None
+    _log_queue = None
+
+
+def _start_flush_thread(interval: float) -> None:
+    global _flush_thread, _flush_stop
+    _flush_stop = threading.Event()
+    _flush_thread = threading.Thread(target=_flush_loop, args=(interval, _flush_stop),
+                                     name="log-flush", daemon=True)
+    _flush_thread.start()
+
+
+def _flush_loop(interval: float, stop: threading.Event) -> None:
+    # One thread for the whole run; wait() returns True once stopped
+    while not stop.wait(interval):
+        flush_logging()
+
+
+def _stop_flush_thread() -> None:
+    """Stop the periodic flush, waiting out a flush in progress so handlers
+    are never flushed after they are closed."""
+    global _flush_thread, _flush_stop
+    if _flush_stop is not None:
+        _flush_stop.set()
+    if _flush_thread is not None and _flush_thread is not threading.current_thread():
+        _flush_thread.join()
+    _flush_thread = _flush_stop = None
+
 
 def _coerce_level(name_or_int: Any) -> int:
     if isinstance(name_or_int, int):
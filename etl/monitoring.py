@@ -5,16 +5,24 @@ Provides detailed tracking of success rates and error patterns.
 
 import json
 import logging
+import os
 import time
-from dataclasses import asdict, dataclass
+from collections import defaultdict
+from dataclasses import dataclass, fields
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .logging_config import flush_logging
+
 log = logging.getLogger(__name__)
 
+# Fixed status labels reused for every completed source
+_STATUS_OK = "SUCCESS"
+_STATUS_FAIL = "FAILED"
+
 
-@dataclass
+@dataclass(slots=True)
 class SourceMetrics:
     """Metrics for a single data source."""
     name: str
@@ -40,7 +48,7 @@ class SourceMetrics:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        result = asdict(self)
+        result = {name: getattr(self, name) for name in _METRIC_FIELDS}
         result['duration_seconds'] = self.duration_seconds
         result['start_time_iso'] = datetime.fromtimestamp(self.start_time).isoformat()
         if self.end_time:
@@ -48,16 +56,36 @@ class SourceMetrics:
         return result
 
 
+_METRIC_FIELDS = tuple(f.name for f in fields(SourceMetrics))
+
+
+def _new_type_stats() -> Dict[str, Any]:
+    """Empty per-source-type stats bucket for get_summary."""
+    return {
+        'total': 0,
+        'successful': 0,
+        'failed': 0,
+        'total_features': 0,
+        'total_files': 0,
+        'avg_duration': 0.0,
+        'error_types': defaultdict(int)
+    }
+
+
 class PipelineMonitor:
     """Monitor pipeline execution and collect metrics."""
 
-    def __init__(self):
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
         self.metrics: List[SourceMetrics] = []
         self.pipeline_start_time = time.time()
         self.current_source: Optional[SourceMetrics] = None
 
     def start_source(self, name: str, authority: str, source_type: str) -> SourceMetrics:
         """Start monitoring a data source."""
+        if not self.enabled:
+            return _NULL_METRIC
+
         self.current_source = SourceMetrics(
             name=name,
             authority=authority,
@@ -65,13 +93,16 @@ class PipelineMonitor:
             start_time=time.time()
         )
 
-        log.info(f"[MONITOR] Starting {source_type.upper()} source: {name} ({authority})")
+        if log.isEnabledFor(logging.INFO):
+            log.info("[MONITOR] Starting %s source: %s (%s)", source_type.upper(), name, authority)
         return self.current_source
 
     def end_source(self, success: bool, error_type: Optional[str] = None,
                    error_message: Optional[str] = None, features: int = 0,
                    files: int = 0, response_size: int = 0, retries: int = 0) -> None:
         """End monitoring current data source."""
+        if not self.enabled:
+            return
         if not self.current_source:
             log.warning("[MONITOR] No current source to end")
             return
@@ -86,14 +117,15 @@ class PipelineMonitor:
         self.current_source.retry_count = retries
         self.current_source.response_time_ms = self.current_source.duration_seconds * 1000
 
-        status = "SUCCESS" if success else "FAILED"
+        status = _STATUS_OK if success else _STATUS_FAIL
         duration = self.current_source.duration_seconds
 
-        log.info(f"[MONITOR] Completed {self.current_source.source_type.upper()} source: "
-                f"{self.current_source.name} - {status} ({duration:.2f}s)")
+        if log.isEnabledFor(logging.INFO):
+            log.info("[MONITOR] Completed %s source: %s - %s (%.2fs)",
+                     self.current_source.source_type.upper(), self.current_source.name, status, duration)
 
         if not success and error_type:
-            log.warning(f"[MONITOR] Error details: {error_type} - {error_message}")
+            log.warning("[MONITOR] Error details: %s - %s", error_type, error_message)
 
         self.metrics.append(self.current_source)
         self.current_source = None
@@ -103,22 +135,10 @@ class PipelineMonitor:
         total_duration = time.time() - self.pipeline_start_time
 
         # Group by source type
-        by_type: Dict[str, Dict[str, Any]] = {}
+        by_type: Dict[str, Dict[str, Any]] = defaultdict(_new_type_stats)
 
         for metric in self.metrics:
-            source_type = metric.source_type
-            if source_type not in by_type:
-                by_type[source_type] = {
-                    'total': 0,
-                    'successful': 0,
-                    'failed': 0,
-                    'total_features': 0,
-                    'total_files': 0,
-                    'avg_duration': 0,
-                    'error_types': {}
-                }
-
-            stats = by_type[source_type]
+            stats = by_type[metric.source_type]
             stats['total'] += 1
 
             if metric.success:
@@ -126,8 +146,7 @@ class PipelineMonitor:
             else:
                 stats['failed'] += 1
                 if metric.error_type:
-                    error_type = metric.error_type
-                    stats['error_types'][error_type] = stats['error_types'].get(error_type, 0) + 1
+                    stats['error_types'][metric.error_type] += 1
 
             stats['total_features'] += metric.features_downloaded
             stats['total_files'] += metric.files_downloaded
@@ -140,6 +159,7 @@ class PipelineMonitor:
                 stats['avg_duration'] = stats['avg_duration'] / stats['total']
             else:
                 stats['success_rate'] = 0
+            stats['error_types'] = dict(stats['error_types'])
 
         # Overall summary
         total_sources = len(self.metrics)
@@ -152,7 +172,7 @@ class PipelineMonitor:
             'successful_sources': successful_sources,
             'failed_sources': total_sources - successful_sources,
             'overall_success_rate': (successful_sources / total_sources * 100) if total_sources > 0 else 0,
-            'by_source_type': by_type,
+            'by_source_type': dict(by_type),
             'individual_sources': [m.to_dict() for m in self.metrics]
         }
 
@@ -160,38 +180,57 @@ class PipelineMonitor:
 
     def log_summary(self) -> None:
         """Log a human-readable summary."""
+        if not self.enabled:
+            return
         summary = self.get_summary()
 
         log.info("="*60)
         log.info("PIPELINE EXECUTION SUMMARY")
         log.info("="*60)
-        log.info(f"Total Duration: {summary['total_duration_seconds']:.2f} seconds")
-        log.info(f"Overall Success Rate: {summary['overall_success_rate']:.1f}% "
-                f"({summary['successful_sources']}/{summary['total_sources']})")
+        log.info("Total Duration: %.2f seconds", summary['total_duration_seconds'])
+        log.info("Overall Success Rate: %.1f%% (%d/%d)", summary['overall_success_rate'],
+                 summary['successful_sources'], summary['total_sources'])
 
         for source_type, stats in summary['by_source_type'].items():
-            log.info(f"\n{source_type.upper()} sources: {stats['success_rate']:.1f}% success "
-                    f"({stats['successful']}/{stats['total']})")
+            log.info("\n%s sources: %.1f%% success (%d/%d)", source_type.upper(),
+                     stats['success_rate'], stats['successful'], stats['total'])
 
             if stats['failed'] > 0:
-                log.info(f"  Failed with errors: {dict(stats['error_types'])}")
+                log.info("  Failed with errors: %s", dict(stats['error_types']))
 
             if stats['total_features'] > 0:
-                log.info(f"  Total features downloaded: {stats['total_features']:,}")
+                log.info("  Total features downloaded: %s", f"{stats['total_features']:,}")
 
             if stats['total_files'] > 0:
-                log.info(f"  Total files downloaded: {stats['total_files']}")
+                log.info("  Total files downloaded: %d", stats['total_files'])
+
+            log.info("  Average duration: %.2fs", stats['avg_duration'])
 
-            log.info(f"  Average duration: {stats['avg_duration']:.2f}s")
+        flush_logging()
 
-    def save_metrics(self, output_path: Path) -> None:
-        """Save metrics to JSON file."""
+    def save_metrics(self, output_path: Path, durable: bool = False) -> None:
+        """Save metrics to JSON file; fsync only when durable=True."""
+        if not self.enabled:
+            log.debug("[MONITOR] Monitoring disabled; not saving metrics to %s", output_path)
+            return
         summary = self.get_summary()
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+        payload = json.dumps(summary, indent=2, ensure_ascii=False).encode('utf-8')
+
+        # Single unbuffered write of the encoded payload instead of text-mode chunks
+        fd = os.open(str(output_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            view = memoryview(payload)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            if durable:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
 
-        log.info(f"[MONITOR] Metrics saved to {output_path}")
+        log.info("[MONITOR] Metrics saved to %s", output_path)
+        flush_logging()
 
     def detect_patterns(self) -> Dict[str, Any]:
         """Detect error patterns and performance issues."""
@@ -232,8 +271,11 @@ class PipelineMonitor:
         return patterns
 
 
-# Global monitor instance
-monitor = PipelineMonitor()
+# Shared stand-in returned by a disabled monitor
+_NULL_METRIC = SourceMetrics(name='', authority='', source_type='', start_time=0.0)
+
+# Global monitor instance (set OP_ETL_MONITOR=0 to disable metric collection)
+monitor = PipelineMonitor(enabled=os.environ.get("OP_ETL_MONITOR", "1") != "0")
 
 
 def start_monitoring_source(name: str, authority: str, source_type: str) -> SourceMetrics:
@@ -253,9 +295,9 @@ def log_pipeline_summary() -> None:
     monitor.log_summary()
 
 
-def save_pipeline_metrics(output_path: Path) -> None:
+def save_pipeline_metrics(output_path: Path, durable: bool = False) -> None:
     """Save pipeline metrics to file."""
-    monitor.save_metrics(output_path)
+    monitor.save_metrics(output_path, durable)
 
 
 def get_error_patterns() -> Dict[str, Any]:
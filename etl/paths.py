@@ -1,7 +1,13 @@
+from functools import lru_cache
 from pathlib import Path
 
 from .utils import make_arcpy_safe_name
 
+# Feature classes that survived processing, one JSON string per line, written
+# next to the staging GDB as they finish; the .json form is the legacy list
+PROCESSED_LIST_NAME = "processed_feature_classes.jsonl"
+LEGACY_PROCESSED_LIST_NAME = "processed_feature_classes.json"
+
 
 def ensure_workspaces(cfg: dict) -> None:
     ws = cfg["workspaces"]
@@ -23,8 +29,19 @@ def ensure_workspaces(cfg: dict) -> None:
         pass
 
 
+@lru_cache(maxsize=32)
+def _normalized_gdb(gdb_path: str) -> str:
+    """Forward-slash form of a GDB path; the staging GDB is fixed per run so this is computed once."""
+    return gdb_path.replace(chr(92)*2,'/').replace(chr(92),'/')
+
+
 def staging_path(cfg: dict, name: str) -> str:
     """Return canonical FGDB path with ArcPy-safe feature class name."""
     safe_name = make_arcpy_safe_name(name)
-    gdb_path = cfg['workspaces']['staging_gdb'].replace(chr(92)*2,'/').replace(chr(92),'/')
-    return f"{gdb_path}/{safe_name}"
+    return f"{_normalized_gdb(cfg['workspaces']['staging_gdb'])}/{safe_name}"
+
+
+def processed_list_paths(staging_gdb: str) -> tuple[Path, Path]:
+    """Return (jsonl_path, legacy_json_path) for the processed feature class list."""
+    parent = Path(staging_gdb).parent
+    return parent / PROCESSED_LIST_NAME, parent / LEGACY_PROCESSED_LIST_NAME
@@ -1,10 +1,27 @@
 # Replace etl/process.py with this simplified version:
 
 import contextlib
-import json
 import logging
-from pathlib import Path
-from typing import Optional
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from .logging_config import install_queue_logging, worker_log_queue
+from .paths import processed_list_paths
+from .sr_utils import spatial_reference
+from .staging_index import get_staging_feature_classes, invalidate_staging_index
+from .utils import cached_exists, forget_exists, json_dumps_bytes
+
+log = logging.getLogger(__name__)
+
+# RAM-backed arcpy workspace for intermediates that never need to hit disk
+MEMORY_WORKSPACE = "memory"
+
+
+class ReplaceFailedError(Exception):
+    """Raised when the original feature class was deleted but could not be replaced."""
+    pass
 
 
 def run(cfg):
@@ -12,131 +29,262 @@ def run(cfg):
     import arcpy  # lazy import
     gp = cfg.get("geoprocess", {})
     if not gp.get("enabled"):
-        logging.info("[PROCESS] Geoprocessing disabled")
+        log.info("[PROCESS] Geoprocessing disabled")
         return
 
+    # Let Clip/Project shard geometry work across cores (geoprocess.parallel_processing_factor);
+    # applied with EnvManager around the processing loop only
+    parallel_factor = str(gp.get("parallel_processing_factor") or "100%")
+
+    forget_exists()
     staging_gdb = cfg["workspaces"]["staging_gdb"]
     aoi = gp.get("aoi_boundary")
     target_wkid = gp.get("target_wkid") or gp.get("target_srid")
 
     # Validate AOI boundary exists if configured
-    if aoi and not arcpy.Exists(aoi):
-        logging.warning(f"[PROCESS] AOI boundary not found: {aoi}")
+    if aoi and not cached_exists(aoi):
+        log.warning(f"[PROCESS] AOI boundary not found: {aoi}")
         aoi = None  # Disable clipping if AOI doesn't exist
 
-    # List actual feature classes in staging using arcpy.da.Walk
+    # List actual feature classes in staging (top level and feature datasets)
     # Collect tuples of (full_path, relative_path, name)
-    feature_classes = []
     try:
-        if not arcpy.Exists(staging_gdb):
-            logging.error(f"[PROCESS] Staging GDB not found: {staging_gdb}")
+        if not cached_exists(staging_gdb):
+            log.error(f"[PROCESS] Staging GDB not found: {staging_gdb}")
             return
 
-        for dirpath, dirnames, filenames in arcpy.da.Walk(staging_gdb, datatype="FeatureClass"):
-            for name in filenames:
-                fc_path = f"{dirpath}/{name}"
-                # Build relative path inside the GDB (dataset/feature or just feature)
-                rel_dir = dirpath[len(staging_gdb):] if str(dirpath).startswith(str(staging_gdb)) else ""
-                rel_dir = str(rel_dir).strip("/\\")
-                rel_path = f"{rel_dir}/{name}" if rel_dir else name
-                feature_classes.append((fc_path, rel_path, name))
+        feature_classes = get_staging_feature_classes(staging_gdb)
     except Exception as e:
-        logging.error(f"[PROCESS] Cannot access staging GDB: {e}")
+        log.error(f"[PROCESS] Cannot access staging GDB: {e}")
         return
 
     if not feature_classes:
-        logging.info("[PROCESS] No feature classes found in staging")
+        log.info("[PROCESS] No feature classes found in staging")
         return
 
-    processed_count = 0
-    successfully_processed: list[str] = []  # Track relative paths that were successfully processed
-
-    for fc_path, rel_fc_path, fc_name in feature_classes:
-
-        try:
-            if not arcpy.Exists(fc_path):
-                continue
-
-            if process_feature_class(fc_path, aoi, target_wkid):
-                processed_count += 1
-                successfully_processed.append(rel_fc_path)
-                logging.info(f"[PROCESS] ✓ {fc_name}")
-            elif aoi:
-                logging.info(f"[PROCESS] ⤬ {fc_name} (no features within AOI – skipped)")
-            else:
-                logging.info(f"[PROCESS] ⤬ {fc_name} (no processing applied – skipped)")
+    # performance.parallel_processing: process feature classes concurrently, one
+    # process (own arcpy session) per worker; workers from parallel_workers.
+    # Off by default; arcpy geoprocessing is not thread-safe, so never threads
+    perf = cfg.get("performance", {})
+    workers = 1
+    if perf.get("parallel_processing", False):
+        workers = max(1, min(int(perf.get("parallel_workers", 1) or 1),
+                             os.cpu_count() or 1, len(feature_classes)))
 
-        except Exception as e:
-            logging.error(f"[PROCESS] ✗ {fc_name}: {e}")
+    clip_mode = str(gp.get("clip_mode") or "clip").lower()
+    items = [(fc_path, rel_fc_path, fc_name, aoi, target_wkid, clip_mode)
+             for fc_path, rel_fc_path, fc_name in feature_classes]
 
-    # Save list of successfully processed feature classes only when AOI is provided
-    processed_file = Path(staging_gdb).parent / "processed_feature_classes.json"
+    # Successes are appended to a JSONL file as they finish (only when AOI is
+    # provided), so a crashed run still leaves an accurate partial list
+    processed_file, legacy_file = processed_list_paths(staging_gdb)
+    with contextlib.suppress(OSError):
+        legacy_file.unlink()  # superseded by the JSONL list
+    processed_out = None
     if aoi is not None:
         try:
-            with open(processed_file, 'w') as f:
-                json.dump(successfully_processed, f, indent=2)
-            logging.info(f"[PROCESS] Saved {len(successfully_processed)} successfully processed feature classes to {processed_file}")
-        except IOError as e:
-            logging.warning(f"[PROCESS] Failed to save processed feature classes list: {e}")
+            processed_out = open(processed_file, "wb", buffering=0)
+        except OSError as e:
+            log.warning(f"[PROCESS] Failed to open processed feature classes list: {e}")
     else:
         # AOI disabled: ensure no stale processed file exists
         try:
             if processed_file.exists():
                 processed_file.unlink()
-                logging.info("[PROCESS] AOI disabled; removed existing processed feature classes list")
+                log.info("[PROCESS] AOI disabled; removed existing processed feature classes list")
         except Exception as e:
-            logging.debug(f"[PROCESS] Could not remove processed list: {e}")
+            log.debug(f"[PROCESS] Could not remove processed list: {e}")
+
+    processed_count = 0
+    replace_failed = False
+
+    def _collect(results) -> None:
+        nonlocal processed_out, processed_count, replace_failed
+        # Results arrive in input order, so the saved list is deterministic
+        for rel_fc_path, fc_name, status, error in results:
+            if status == "ok":
+                processed_count += 1
+                log.info(f"[PROCESS] ✓ {fc_name}")
+                if processed_out is not None:
+                    try:
+                        processed_out.write(json_dumps_bytes(rel_fc_path) + b"\n")
+                    except OSError as e:
+                        log.warning(f"[PROCESS] Failed to save processed feature classes list: {e}")
+                        processed_out.close()
+                        processed_out = None
+            elif status in ("error", "replace_failed"):
+                replace_failed = replace_failed or status == "replace_failed"
+                log.error(f"[PROCESS] ✗ {fc_name}: {error}")
+            elif aoi:
+                log.info(f"[PROCESS] ⤬ {fc_name} (no features within AOI – skipped)")
+            else:
+                log.info(f"[PROCESS] ⤬ {fc_name} (no processing applied – skipped)")
+
+    with arcpy.EnvManager(parallelProcessingFactor=parallel_factor):
+        try:
+            if workers > 1:
+                log.info(f"[PROCESS] Processing {len(items)} feature classes with {workers} processes")
+                with worker_log_queue() as log_queue, \
+                        ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(parallel_factor, log_queue,
+                                                      logging.getLogger().level)) as executor:
+                    _collect(executor.map(_process_one, items))
+            else:
+                _collect(map(_process_one, items))
+        finally:
+            if processed_out is not None:
+                processed_out.close()
+                log.info(f"[PROCESS] Saved {processed_count} successfully processed feature classes to {processed_file}")
+            # Release anything left in this process's memory workspace
+            with contextlib.suppress(Exception):
+                arcpy.management.Delete(MEMORY_WORKSPACE)
+            # A failed replace can leave a feature class deleted; only then must the
+            # load step list staging afresh rather than reuse this listing
+            if replace_failed:
+                invalidate_staging_index(staging_gdb)
+
+    log.info(f"[PROCESS] Processed {processed_count} feature classes")
+
+def _init_worker(parallel_factor: str, log_queue, log_level: int = logging.NOTSET) -> None:
+    """Apply run()'s arcpy environment and queue logging in a fresh worker process."""
+    install_queue_logging(log_queue, log_level)
+    import arcpy
+    arcpy.env.parallelProcessingFactor = parallel_factor
 
-    logging.info(f"[PROCESS] Processed {processed_count} feature classes")
 
-def process_feature_class(fc_path: str, aoi_fc: Optional[str] = None, target_wkid: Optional[int] = None) -> bool:
-    """Process a feature class with clipping and reprojection to EPSG:3010."""
+def _process_one(item: tuple) -> Tuple[str, str, str, Optional[str]]:
+    """Process one feature class; picklable so it can run in a worker process.
+
+    Returns (relative_path, name, status, error) with status "ok", "skipped",
+    "replace_failed" or "error".
+    """
+    fc_path, rel_fc_path, fc_name, aoi, target_wkid, clip_mode = item
+    try:
+        # Listing already guarantees existence and aoi was validated by run()
+        if process_feature_class(fc_path, aoi, target_wkid, aoi_checked=True, clip_mode=clip_mode):
+            return rel_fc_path, fc_name, "ok", None
+        return rel_fc_path, fc_name, "skipped", None
+    except ReplaceFailedError as e:
+        return rel_fc_path, fc_name, "replace_failed", str(e)
+    except Exception as e:
+        return rel_fc_path, fc_name, "error", str(e)
+
+
+def _has_rows(fc: str) -> bool:
+    """Return True if the feature class has at least one row, without counting them all."""
+    import arcpy
+    with arcpy.da.SearchCursor(fc, ["OID@"]) as cursor:
+        return next(iter(cursor), None) is not None
+
+
+def _select_in_place(fc_path: str, aoi_fc: str) -> bool:
+    """Delete features that do not intersect the AOI, editing fc_path in place.
+
+    Returns False (leaving the data untouched) when no feature intersects.
+    """
+    import arcpy
+    # Unique per call: same-named FCs in different datasets must not share a layer
+    layer = f"aoi_lyr_{uuid.uuid4().hex}"
+    arcpy.management.MakeFeatureLayer(fc_path, layer)
+    try:
+        # Selection sizes come from the tools' own count outputs, not GetCount
+        # row scans; a cursor cannot tell, since a layer with an empty
+        # selection iterates every row
+        selected = arcpy.management.SelectLayerByLocation(layer, "INTERSECT", aoi_fc)
+        inside = int(selected.getOutput(2))
+        if inside == 0:
+            return False
+        switched = arcpy.management.SelectLayerByAttribute(layer, "SWITCH_SELECTION")
+        outside = int(switched.getOutput(1))
+        # Only delete when something lies outside; DeleteFeatures on a layer
+        # with an empty selection would remove every row
+        if outside:
+            arcpy.management.DeleteFeatures(layer)
+        log.debug(f"[PROCESS] Kept {inside} of {inside + outside} features intersecting AOI")
+        return True
+    finally:
+        with contextlib.suppress(Exception):
+            arcpy.management.Delete(layer)
+
+
+def _wkid(fc: str) -> int:
+    """Factory code of a feature class's SR (da.Describe returns a plain dict, not a lazy Describe object)."""
+    import arcpy
+    return arcpy.da.Describe(fc)["spatialReference"].factoryCode
+
+
+def process_feature_class(fc_path: str, aoi_fc: Optional[str] = None, target_wkid: Optional[int] = None,
+                          aoi_checked: bool = False, clip_mode: str = "clip") -> bool:
+    """Process a feature class with clipping and reprojection to EPSG:3010.
+
+    Pass aoi_checked=True when the caller has already confirmed aoi_fc exists.
+    clip_mode "clip" cuts geometries at the AOI boundary (Clip to a temp copy);
+    "select" keeps whole intersecting features and deletes the rest in place.
+    Raises ReplaceFailedError when the original was deleted but not replaced.
+    """
     import arcpy
     needs_processing = False
     temp_fcs = []
     current_fc = fc_path
+    current_wkid = None  # read once; Clip and in-place selection keep the SR
 
     try:
-        # Check feature count
-        feature_count = int(str(arcpy.management.GetCount(current_fc)[0]))
-        if feature_count == 0:
-            logging.info(f"[PROCESS] Skipping empty feature class: {fc_path}")
+        # Check for any features; a full GetCount walks every row
+        if not _has_rows(current_fc):
+            log.info(f"[PROCESS] Skipping empty feature class: {fc_path}")
             return False
 
         # Apply AOI clipping for Strängnäs area if configured
-        if aoi_fc and arcpy.Exists(aoi_fc):
+        if aoi_fc and clip_mode == "select" and (aoi_checked or cached_exists(aoi_fc)):
+            # In place: keep whole features that intersect the AOI, no copy or rename
+            try:
+                if not _select_in_place(fc_path, aoi_fc):
+                    log.info(f"[PROCESS] No features in Strängnäs area for {fc_path}")
+                    return False
+                needs_processing = True
+            except Exception as e:
+                log.error(f"[PROCESS] AOI selection failed: {e}")
+                return False
+        elif aoi_fc and (aoi_checked or cached_exists(aoi_fc)):
             try:
+                # When a projection will follow, the clip is only an intermediate:
+                # keep it in the memory workspace and let Project write to disk
                 temp_clip = f"{fc_path}_temp_clip"
-                logging.debug("[PROCESS] Clipping to Strängnäs area")
+                if target_wkid:
+                    with contextlib.suppress(Exception):
+                        current_wkid = _wkid(fc_path)
+                    if current_wkid is not None and current_wkid != target_wkid:
+                        # Unique per call: same-named FCs in different datasets
+                        # would otherwise share one memory path
+                        temp_clip = f"{MEMORY_WORKSPACE}/clip_{uuid.uuid4().hex}"
+                log.debug("[PROCESS] Clipping to Strängnäs area")
+                temp_fcs.append(temp_clip)  # cleaned up in finally, whatever happens
                 arcpy.analysis.Clip(current_fc, aoi_fc, temp_clip)
 
-                clip_count = int(str(arcpy.management.GetCount(temp_clip)[0]))
-                if clip_count > 0:
-                    temp_fcs.append(temp_clip)
-                    current_fc = temp_clip
+                if _has_rows(temp_clip):
                     needs_processing = True
-                    logging.debug(f"[PROCESS] Clipped {feature_count} -> {clip_count} features")
+                    # No counts: the debug file keeps DEBUG on, and a count scans every row
+                    log.debug(f"[PROCESS] Clip of {fc_path} kept features")
+                    current_fc = temp_clip
                 else:
-                    logging.info(f"[PROCESS] No features in Strängnäs area for {fc_path}")
-                    if arcpy.Exists(temp_clip):
-                        arcpy.management.Delete(temp_clip)
+                    log.info(f"[PROCESS] No features in Strängnäs area for {fc_path}")
                     return False
             except Exception as e:
                 # If clipping fails while AOI is provided, stop further processing to avoid un-clipped data
-                logging.error(f"[PROCESS] Clipping failed: {e}")
+                log.error(f"[PROCESS] Clipping failed: {e}")
                 return False
 
         # Project to SWEREF99 16 30 (EPSG:3010) if needed
         if target_wkid:
             try:
-                desc = arcpy.Describe(current_fc)
-                current_wkid = desc.spatialReference.factoryCode
+                if current_wkid is None:
+                    current_wkid = _wkid(current_fc)
 
                 if current_wkid != target_wkid:
                     temp_proj = f"{fc_path}_temp_proj"
-                    target_sr = arcpy.SpatialReference(target_wkid)
+                    target_sr = spatial_reference(target_wkid)
 
-                    logging.debug(f"[PROCESS] Reprojecting from EPSG:{current_wkid} to EPSG:{target_wkid}")
+                    log.debug(f"[PROCESS] Reprojecting from EPSG:{current_wkid} to EPSG:{target_wkid}")
 
                     # Simplified reprojection rule:
                     # If WGS84 (EPSG:4326) to SWEREF99 16 30 (EPSG:3010), use explicit transformation.
@@ -150,30 +298,35 @@ def process_feature_class(fc_path: str, aoi_fc: Optional[str] = None, target_wki
                     current_fc = temp_proj
                     needs_processing = True
                 else:
-                    logging.debug(f"[PROCESS] Already in target SR EPSG:{target_wkid}")
+                    log.debug(f"[PROCESS] Already in target SR EPSG:{target_wkid}")
 
             except Exception as e:
-                logging.warning(f"[PROCESS] Reprojection failed: {e}")
+                log.warning(f"[PROCESS] Reprojection failed: {e}")
 
         # Replace original with processed version
         if needs_processing and current_fc != fc_path:
             try:
                 arcpy.management.Delete(fc_path)
-                arcpy.management.Rename(current_fc, fc_path)
-                if current_fc in temp_fcs:
+                if current_fc.startswith(f"{MEMORY_WORKSPACE}/"):
+                    # Rename cannot move data out of memory; materialise it and
+                    # leave the memory copy in temp_fcs for deletion
+                    arcpy.management.CopyFeatures(current_fc, fc_path)
+                else:
+                    arcpy.management.Rename(current_fc, fc_path)
                     temp_fcs.remove(current_fc)
             except Exception as e:
-                logging.error(f"[PROCESS] Failed to replace original: {e}")
-                return False
+                raise ReplaceFailedError(f"Failed to replace original: {e}") from e
 
         return needs_processing
 
+    except ReplaceFailedError:
+        raise
     except Exception as e:
-        logging.error(f"Processing failed for {fc_path}: {e}")
+        log.error(f"Processing failed for {fc_path}: {e}")
         return False
     finally:
-        # Cleanup
-        for temp_fc in temp_fcs:
-            with contextlib.suppress(Exception):
-                if arcpy.Exists(temp_fc):
-                    arcpy.management.Delete(temp_fc)
+        # Cleanup: one Delete call for all leftovers instead of one tool run each
+        with contextlib.suppress(Exception):
+            leftovers = [t for t in temp_fcs if arcpy.Exists(t)]
+            if leftovers:
+                arcpy.management.Delete(leftovers)
@@ -3,7 +3,17 @@ Spatial Reference (SR) utilities for ETL pipeline.
 Provides validation, sanity checks, and consistency enforcement.
 """
 import logging
-from typing import Optional, List, Dict, Any, Tuple
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Mapping, Tuple
+
+try:
+    import numpy as np  # optional; ships with ArcGIS Pro
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+from .utils import json_loads
 
 log = logging.getLogger(__name__)
 
@@ -11,6 +21,57 @@ log = logging.getLogger(__name__)
 SWEREF99_TM = 3006  # Swedish reference system, meters
 WGS84_DD = 4326     # World Geodetic System, degrees
 CRS84 = "CRS84"     # OGC CRS84 (equivalent to WGS84 but lon/lat order)
+_EPSG_SWEREF99_STR = f"EPSG:{SWEREF99_TM}"
+
+# CRS name forms: "EPSG:3006", "urn:ogc:def:crs:EPSG::3006",
+# "urn:ogc:def:crs:EPSG:6.6:3006", "http://www.opengis.net/def/crs/EPSG/0/3006"
+_EPSG_RE = re.compile(r'EPSG[:/\s]*(?:[\d.]+[:/])?(\d+)', re.IGNORECASE)
+# "CRS84", "urn:ogc:def:crs:OGC:1.3:CRS84", "http://www.opengis.net/def/crs/OGC/1.3/CRS84"
+_CRS84_RE = re.compile(r'(?:^|[:/])CRS:?84$', re.IGNORECASE)
+
+# Common CRS name forms -> EPSG code, checked before parsing; read-only, so the
+# OGC collection threads can share it. Other names go through _parse_crs_name's lru_cache
+_CRS_NAME_SEEDS: Mapping[str, int] = MappingProxyType({
+    'EPSG:4326': WGS84_DD,
+    'EPSG:3006': SWEREF99_TM,
+    'CRS84': WGS84_DD,
+    'urn:ogc:def:crs:EPSG::4326': WGS84_DD,
+    'urn:ogc:def:crs:EPSG::3006': SWEREF99_TM,
+    'urn:ogc:def:crs:OGC:1.3:CRS84': WGS84_DD,
+})
+
+# REST source SR settings (raw overrides) and their defaults, in config order
+_REST_SR_DEFAULTS: Dict[str, int] = {
+    'bbox_sr': SWEREF99_TM,
+    'in_sr': SWEREF99_TM,
+    'out_sr': SWEREF99_TM,
+    'stage_sr': SWEREF99_TM,
+    'target_sr': SWEREF99_TM,
+}
+_REST_SR_DEFAULT_VALUES = tuple(_REST_SR_DEFAULTS.values())
+
+# Coordinate bounds per EPSG code: (hard bounds, soft bounds or None), each
+# as (xmin, xmax, ymin, ymax). Outside hard bounds fails validation; outside
+# soft bounds (Sweden, for degree-based SRs) only warns. Add new SRs here.
+_BOUNDS_BY_EPSG: Dict[int, Tuple[Tuple[float, float, float, float], Optional[Tuple[float, float, float, float]]]] = {
+    # SWEREF99 TM, meters; rough bounds for Sweden
+    SWEREF99_TM: ((200000.0, 900000.0, 6100000.0, 7700000.0), None),
+    # WGS84 degrees; Sweden roughly lon 10-25, lat 55-70
+    WGS84_DD: ((-180.0, 180.0, -90.0, 90.0), (10.0, 25.0, 55.0, 70.0)),
+}
+
+_ENV_KEY_SET = frozenset(('xmin', 'ymin', 'xmax', 'ymax'))
+
+
+@lru_cache(maxsize=32)
+def spatial_reference(wkid: int):
+    """Return a cached arcpy.SpatialReference for a WKID.
+
+    Building one re-resolves the code against the projection registry, so
+    each WKID is constructed once per process. Treat the result as read-only.
+    """
+    import arcpy  # lazy import
+    return arcpy.SpatialReference(wkid)
 
 def validate_coordinates_magnitude(coords: List[float], expected_sr: int) -> bool:
     """
@@ -26,37 +87,64 @@ def validate_coordinates_magnitude(coords: List[float], expected_sr: int) -> boo
     if not coords or len(coords) < 2:
         return False
         
-    x, y = coords[0], coords[1]
-    
-    if expected_sr == SWEREF99_TM:
-        return _validate_sweref99_bounds(x, y)
-    elif expected_sr == WGS84_DD:
-        return _validate_wgs84_bounds(x, y)
-        
-    return True
+    if expected_sr not in _BOUNDS_BY_EPSG:
+        return True
+    return _validate_bounds(expected_sr, coords[0], coords[1])
 
 
-def _validate_sweref99_bounds(x: float, y: float) -> bool:
-    """Validate SWEREF99 TM coordinate bounds."""
-    # SWEREF99 TM (EPSG:3006) - should be in meters
-    # Rough bounds for Sweden: X: 200000-900000, Y: 6100000-7700000
-    if not (200000 <= x <= 900000 and 6100000 <= y <= 7700000):
-        log.warning(f"Coordinates {x}, {y} outside expected SWEREF99 TM bounds")
-        return False
-    return True
+def validate_coordinate_array(coords, expected_sr: int) -> Tuple[bool, Any]:
+    """
+    Validate many coordinate pairs at once against the expected SR's hard bounds.
 
+    Args:
+        coords: (N, 2) array-like of [x/lon, y/lat] rows (extra columns ignored),
+            or a single flat [x, y] pair
+        expected_sr: Expected EPSG code
 
-def _validate_wgs84_bounds(x: float, y: float) -> bool:
-    """Validate WGS84 coordinate bounds."""
-    # WGS84 - should be in degrees
-    # Sweden roughly: Lon: 10-25, Lat: 55-70
-    if not (-180 <= x <= 180 and -90 <= y <= 90):
-        log.warning(f"Coordinates {x}, {y} outside valid WGS84 degree bounds")
+    Returns:
+        Tuple of (all_valid, mask) where mask flags the offending rows.
+        Uses NumPy comparisons when available, a Python loop otherwise.
+        Only the hard bounds are checked; the soft Sweden-in-degrees warning
+        of validate_coordinates_magnitude is not repeated per row.
+    """
+    bounds = _BOUNDS_BY_EPSG.get(expected_sr)
+    xmin, xmax, ymin, ymax = bounds[0] if bounds else (None, None, None, None)
+
+    if np is not None:
+        arr = np.asarray(coords, dtype=np.float64)
+        if arr.size == 0:
+            return True, np.zeros(0, dtype=bool)
+        if arr.ndim == 1:
+            arr = arr.reshape(1, -1)  # single flat [x, y] pair
+        arr = arr.reshape(len(arr), -1)
+        if xmin is None:
+            return True, np.zeros(len(arr), dtype=bool)
+        x, y = arr[:, 0], arr[:, 1]
+        bad = ~np.logical_and.reduce((x >= xmin, x <= xmax, y >= ymin, y <= ymax))
+        bad_count = int(bad.sum())
+    else:
+        if coords and isinstance(coords[0], (int, float)):
+            coords = [coords]  # single flat [x, y] pair
+        if xmin is None:
+            return True, [False] * len(coords)
+        bad = [not (xmin <= x <= xmax and ymin <= y <= ymax) for x, y, *_ in coords]
+        bad_count = sum(bad)
+
+    if bad_count:
+        log.warning("%d of %d coordinates outside expected EPSG:%s bounds", bad_count, len(bad), expected_sr)
+    return bad_count == 0, bad
+
+
+def _validate_bounds(epsg: int, x: float, y: float) -> bool:
+    """Validate a coordinate pair against the _BOUNDS_BY_EPSG entry for epsg."""
+    (xmin, xmax, ymin, ymax), soft = _BOUNDS_BY_EPSG[epsg]
+    if not (xmin <= x <= xmax and ymin <= y <= ymax):
+        log.warning("Coordinates %s, %s outside expected EPSG:%s bounds", x, y, epsg)
         return False
-    # More specific check for Sweden
-    if not (10 <= x <= 25 and 55 <= y <= 70):
-        log.warning(f"Coordinates {x}, {y} outside expected Sweden WGS84 bounds")
-        
+    if soft is not None:
+        sxmin, sxmax, symin, symax = soft
+        if not (sxmin <= x <= sxmax and symin <= y <= symax):
+            log.warning("Coordinates %s, %s outside expected Sweden bounds for EPSG:%s", x, y, epsg)
     return True
 
 def validate_bbox_vs_envelope(bbox: List[float], envelope: Dict[str, float], 
@@ -84,9 +172,45 @@ def validate_bbox_vs_envelope(bbox: List[float], envelope: Dict[str, float],
     return _check_coordinate_tolerance(req_coords, resp_coords, tolerance)
 
 
+def validate_bboxes_vs_envelopes_batch(bboxes, envelopes, tolerance: float = 0.1) -> Tuple[bool, Any]:
+    """
+    Vectorised validate_bbox_vs_envelope over many request/response pairs.
+
+    Args:
+        bboxes: (N, 4) array-like of requested [xmin, ymin, xmax, ymax]
+        envelopes: (N, 4) array-like of response [xmin, ymin, xmax, ymax]
+        tolerance: Tolerance factor (0.1 = 10% difference allowed)
+
+    Returns:
+        Tuple of (all_within_tolerance, mask) where mask flags the offending pairs.
+        For a single pair the scalar validate_bbox_vs_envelope is cheaper.
+    """
+    if np is not None:
+        req = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        resp = np.asarray(envelopes, dtype=np.float64).reshape(-1, 4)
+        # Per-row tolerances [x, y, x, y] from the requested width/height
+        x_tol = np.abs(req[:, 2] - req[:, 0]) * tolerance
+        y_tol = np.abs(req[:, 3] - req[:, 1]) * tolerance
+        tols = np.stack((x_tol, y_tol, x_tol, y_tol), axis=1)
+        bad = (np.abs(resp - req) > tols).any(axis=1)
+        bad_count = int(bad.sum())
+    else:
+        bad = []
+        for (rx0, ry0, rx1, ry1), (ex0, ey0, ex1, ey1) in zip(bboxes, envelopes):
+            x_tol = abs(rx1 - rx0) * tolerance
+            y_tol = abs(ry1 - ry0) * tolerance
+            bad.append(abs(ex0 - rx0) > x_tol or abs(ey0 - ry0) > y_tol or
+                       abs(ex1 - rx1) > x_tol or abs(ey1 - ry1) > y_tol)
+        bad_count = sum(bad)
+
+    if bad_count:
+        log.warning("%d of %d response envelopes differ significantly from their bbox", bad_count, len(bad))
+    return bad_count == 0, bad
+
+
 def _validate_envelope_structure(envelope: Dict[str, float]) -> bool:
     """Validate envelope has required fields."""
-    if not envelope or not all(k in envelope for k in ['xmin', 'ymin', 'xmax', 'ymax']):
+    if not envelope or not envelope.keys() >= _ENV_KEY_SET:
         log.warning("Response envelope missing required fields")
         return False
     return True
@@ -110,7 +234,7 @@ def _check_coordinate_tolerance(req_coords: List[float], resp_coords: List[float
         abs(resp_xmax - req_xmax) > x_tolerance or
         abs(resp_ymax - req_ymax) > y_tolerance):
         envelope_dict = {'xmin': resp_xmin, 'ymin': resp_ymin, 'xmax': resp_xmax, 'ymax': resp_ymax}
-        log.warning(f"Response envelope {envelope_dict} differs significantly from bbox {req_coords}")
+        log.warning("Response envelope %s differs significantly from bbox %s", envelope_dict, req_coords)
         return False
         
     return True
@@ -132,12 +256,13 @@ def validate_feature_count_sanity(small_bbox_count: int, large_bbox_count: int,
         return small_bbox_count == 0
         
     if small_bbox_count > large_bbox_count:
-        log.warning(f"Small bbox returned more features ({small_bbox_count}) than large bbox ({large_bbox_count})")
+        log.warning("Small bbox returned more features (%d) than large bbox (%d)", small_bbox_count, large_bbox_count)
         return False
         
-    ratio = small_bbox_count / large_bbox_count if large_bbox_count > 0 else 0
-    if ratio < min_ratio:
-        log.warning(f"Feature count ratio {ratio:.2f} seems too low (small: {small_bbox_count}, large: {large_bbox_count})")
+    # Compare by multiplication so the happy path skips the division
+    if small_bbox_count < large_bbox_count * min_ratio:
+        log.warning("Feature count ratio %.2f seems too low (small: %d, large: %d)",
+                    small_bbox_count / large_bbox_count, small_bbox_count, large_bbox_count)
         
     return True
 
@@ -162,33 +287,43 @@ def detect_sr_from_geojson(geojson_data: Dict[str, Any]) -> Optional[int]:
     if isinstance(properties, dict):
         name = properties.get('name', '')
         if isinstance(name, str):
-            # Handle various CRS name formats
-            if 'EPSG:' in name:
-                try:
-                    return int(name.split('EPSG:')[1].split()[0])
-                except (ValueError, IndexError):
-                    pass
-            elif name.upper() == 'CRS84':
-                return WGS84_DD
+            epsg = _CRS_NAME_SEEDS.get(name)
+            return epsg if epsg is not None else _parse_crs_name(name)
                 
     return None
 
-def validate_sr_consistency(data: Dict[str, Any], expected_sr: Optional[int]) -> Tuple[bool, Optional[int]]:
+@lru_cache(maxsize=64)
+def _parse_crs_name(name: str) -> Optional[int]:
+    """Parse an EPSG code from a CRS name (plain, URN and URL forms); memoised, thread-safe."""
+    if m := _EPSG_RE.search(name):
+        return int(m.group(1))
+    if _CRS84_RE.search(name):
+        return WGS84_DD
+    return None
+
+def validate_sr_consistency(data: Dict[str, Any], expected_sr: Optional[int],
+                            sample_only: bool = True) -> Tuple[bool, Optional[int]]:
     """
     Validate spatial reference consistency in response data.
     
     Args:
         data: Response data (GeoJSON or ArcGIS REST response)
         expected_sr: Expected EPSG code
+        sample_only: Check only the first feature's coordinates; False checks
+            the first coordinate of every feature in one batched pass
         
     Returns:
         Tuple of (is_valid, detected_sr)
     """
-    detected_sr = _detect_sr_from_data(data)
+    is_collection = data.get('type') == 'FeatureCollection'
+    detected_sr = _detect_sr_from_data(data, is_collection)
     
     # Validate coordinate magnitudes if we have features and expected SR
-    if data.get('type') == 'FeatureCollection' and expected_sr:
-        coord_valid = _validate_feature_coordinates(data, expected_sr)
+    if is_collection and expected_sr:
+        if sample_only:
+            coord_valid = _validate_feature_coordinates(data, expected_sr)
+        else:
+            coord_valid = _validate_all_feature_coordinates(data, expected_sr)
         if not coord_valid:
             return False, detected_sr
     
@@ -196,37 +331,64 @@ def validate_sr_consistency(data: Dict[str, Any], expected_sr: Optional[int]) ->
     return _check_sr_consistency(expected_sr, detected_sr)
 
 
-def _detect_sr_from_data(data: Dict[str, Any]) -> Optional[int]:
-    """Detect spatial reference from data."""
-    if data.get('type') == 'FeatureCollection':
+def validate_sr_consistency_bytes(raw: bytes, expected_sr: Optional[int],
+                                  sample_only: bool = True) -> Tuple[bool, Optional[int]]:
+    """Parse a raw JSON payload (orjson when installed) and run validate_sr_consistency."""
+    return validate_sr_consistency(json_loads(raw), expected_sr, sample_only=sample_only)
+
+
+def _detect_sr_from_data(data: Dict[str, Any], is_collection: Optional[bool] = None) -> Optional[int]:
+    """Detect spatial reference from data (is_collection: precomputed FeatureCollection check)."""
+    if is_collection is None:
+        is_collection = data.get('type') == 'FeatureCollection'
+    if is_collection:
         return detect_sr_from_geojson(data)
-    elif 'spatialReference' in data:
-        sr_info = data['spatialReference']
-        if isinstance(sr_info, dict) and 'wkid' in sr_info:
-            return sr_info['wkid']
+    sr_info = data.get('spatialReference')
+    if isinstance(sr_info, dict):
+        return sr_info.get('wkid')
     return None
 
 
 def _validate_feature_coordinates(data: Dict[str, Any], expected_sr: int) -> bool:
     """Validate coordinates in first feature of FeatureCollection."""
-    features = data.get('features', [])
-    if not features:
+    # Take only the first feature so lazily produced feature sequences stay lazy
+    first_feature = next(iter(data.get('features') or ()), None)
+    if first_feature is None:
         return True
         
-    first_feature = features[0]
-    geometry = first_feature.get('geometry', {})
+    geometry = first_feature.get('geometry') or {}
     coordinates = geometry.get('coordinates')
     
     if not coordinates:
         return True
         
-    flat_coords = _flatten_coordinates(coordinates)
-    if flat_coords and len(flat_coords) >= 2:
-        return validate_coordinates_magnitude(flat_coords[:2], expected_sr)
+    xy = first_coordinate_pair(coordinates)
+    if len(xy) >= 2:
+        return validate_coordinates_magnitude(xy, expected_sr)
     
     return True
 
 
+def _validate_all_feature_coordinates(data: Dict[str, Any], expected_sr: int) -> bool:
+    """Validate the first coordinate of every feature in one vectorised check."""
+    first_coords = _collect_first_coords(data.get('features') or ())
+    if not first_coords:
+        return True
+    valid, _ = validate_coordinate_array(first_coords, expected_sr)
+    return valid
+
+
+def _collect_first_coords(features) -> List[List[float]]:
+    """First [x, y] pair of each feature; features without coordinates are skipped."""
+    coords = []
+    for feature in features:
+        geometry = feature.get('geometry') or {}
+        xy = first_coordinate_pair(geometry.get('coordinates'))
+        if len(xy) >= 2:
+            coords.append(xy)
+    return coords
+
+
 def _check_sr_consistency(expected_sr: Optional[int], detected_sr: Optional[int]) -> Tuple[bool, Optional[int]]:
     """Check consistency between expected and detected spatial reference."""
     # Check for unknown SR
@@ -236,7 +398,7 @@ def _check_sr_consistency(expected_sr: Optional[int], detected_sr: Optional[int]
     
     # Check consistency
     if expected_sr and detected_sr and expected_sr != detected_sr:
-        log.warning(f"SR mismatch: expected {expected_sr}, detected {detected_sr}")
+        log.warning("SR mismatch: expected %s, detected %s", expected_sr, detected_sr)
         return False, detected_sr
         
     return True, detected_sr
@@ -248,32 +410,26 @@ def _infer_sr_from_coords(xy: List[float]) -> Optional[int]:
     Returns EPSG code when confidently inferred, otherwise None.
     """
     x, y = xy[0], xy[1]
-    # Degrees plausibility (global)
-    if -180 <= x <= 180 and -90 <= y <= 90:
-        return WGS84_DD
-    # SWEREF99 TM rough bounds (meters, Sweden)
-    if 200000 <= x <= 900000 and 6100000 <= y <= 7700000:
-        return SWEREF99_TM
+    # Degrees plausibility (global) first, then SWEREF99 TM (meters, Sweden)
+    for epsg in (WGS84_DD, SWEREF99_TM):
+        xmin, xmax, ymin, ymax = _BOUNDS_BY_EPSG[epsg][0]
+        if xmin <= x <= xmax and ymin <= y <= ymax:
+            return epsg
     return None
 
 
-def _flatten_coordinates(coords) -> List[float]:
-    """Helper to flatten nested coordinate arrays to get first coordinate pair."""
-    if not coords:
-        return []
-        
-    # Handle different geometry types
-    if isinstance(coords[0], (int, float)):
-        return coords  # Point coordinates
-    elif isinstance(coords[0], list):
-        if len(coords[0]) >= 2 and isinstance(coords[0][0], (int, float)):
-            return coords[0]  # First coordinate of LineString/Polygon
-        elif len(coords[0]) > 0 and isinstance(coords[0][0], list):
-            return _flatten_coordinates(coords[0])  # Nested (Polygon holes, etc.)
-            
+def first_coordinate_pair(coords) -> List[float]:
+    """Return the first [x, y] pair of a (possibly nested) GeoJSON coordinates array."""
+    # Descend iteratively: Point -> [x, y], LineString -> [[x, y], ...],
+    # Polygon/MultiPolygon add one or two more levels of nesting
+    cur = coords
+    while cur and isinstance(cur[0], (list, tuple)):
+        cur = cur[0]
+    if cur and isinstance(cur[0], (int, float)):
+        return list(cur[:2])
     return []
 
-def get_sr_config_for_source(source: Dict[str, Any]) -> Dict[str, Any]:
+def get_sr_config_for_source(source: Dict[str, Any]) -> Mapping[str, Any]:
     """
     Get spatial reference configuration for a source.
     
@@ -281,43 +437,48 @@ def get_sr_config_for_source(source: Dict[str, Any]) -> Dict[str, Any]:
         source: Source configuration
         
     Returns:
-        Dictionary with SR configuration
+        Read-only mapping with SR configuration (cached per distinct settings;
+        use dict(...) for a mutable copy)
     """
     source_type = source.get('type')
-    raw = source.get('raw', {})
-    
+    raw = source.get('raw') or {}
+    # REST SR overrides are rare; skip the per-key lookups unless raw has any
+    rest_srs = _REST_SR_DEFAULT_VALUES
+    if source_type == 'rest' and not raw.keys().isdisjoint(_REST_SR_DEFAULTS):
+        rest_srs = tuple(raw.get(k, default) for k, default in _REST_SR_DEFAULTS.items())
+    return _build_sr_config(source_type, rest_srs, bool(raw.get('supports_epsg_3006', False)))
+
+
+@lru_cache(maxsize=256)
+def _build_sr_config(source_type: Optional[str], rest_srs: Tuple, supports_3006: bool) -> Mapping[str, Any]:
+    """Build the SR configuration for get_sr_config_for_source from hashable settings."""
     # Default configurations based on best practices
     if source_type == 'rest':
-        return {
-            'bbox_sr': raw.get('bbox_sr', SWEREF99_TM),
-            'in_sr': raw.get('in_sr', SWEREF99_TM),
-            'out_sr': raw.get('out_sr', SWEREF99_TM),
-            'stage_sr': raw.get('stage_sr', SWEREF99_TM),
-            'target_sr': raw.get('target_sr', SWEREF99_TM)
-        }
+        config = dict(zip(_REST_SR_DEFAULTS, rest_srs))
     elif source_type == 'ogc':
         # Check if server supports EPSG:3006
-        supports_3006 = raw.get('supports_epsg_3006', False)
         if supports_3006:
-            return {
-                'bbox_crs': f'EPSG:{SWEREF99_TM}',
+            config = {
+                'bbox_crs': _EPSG_SWEREF99_STR,
                 'stage_sr': SWEREF99_TM,
                 'target_sr': SWEREF99_TM
             }
         else:
-            return {
+            config = {
                 'bbox_crs': CRS84,
                 'stage_sr': WGS84_DD,
                 'target_sr': SWEREF99_TM
             }
     elif source_type in ['wfs', 'file', 'atom']:
         # For file-based sources, handle during staging
-        return {
+        config = {
             'stage_sr': None,  # Detect from file
             'target_sr': SWEREF99_TM
         }
+    else:
+        config = {}
         
-    return {}
+    return MappingProxyType(config)
 
 def log_sr_validation_summary(source_name: str, validation_results: Dict[str, Any]):
     """
@@ -327,16 +488,17 @@ def log_sr_validation_summary(source_name: str, validation_results: Dict[str, An
         source_name: Name of the source
         validation_results: Dictionary of validation results
     """
-    log.info(f"[SR] Validation summary for {source_name}:")
+    log.info("[SR] Validation summary for %s:", source_name)
     
+    # Count passed/failed while logging each check
+    passed = total = 0
     for check, result in validation_results.items():
-        status = "✓" if result else "✗"
-        log.info(f"[SR]   {check}: {status}")
+        total += 1
+        if result:
+            passed += 1
+        log.info("[SR]   %s: %s", check, "✓" if result else "✗")
         
-    # Count passed/failed
-    passed = sum(1 for r in validation_results.values() if r)
-    total = len(validation_results)
-    log.info(f"[SR] Overall: {passed}/{total} checks passed")
+    log.info("[SR] Overall: %d/%d checks passed", passed, total)
     
     if passed < total:
-        log.warning(f"[SR] {source_name} failed {total - passed} SR validation checks")
\ No newline at end of file
+        log.warning("[SR] %s failed %d SR validation checks", source_name, total - passed)
\ No newline at end of file
@@ -5,42 +5,75 @@ Replace etl/stage_files.py with this implementation.
 
 import contextlib
 import logging
+import os
 import shutil
+import sqlite3
 import zipfile
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-from .sr_utils import SWEREF99_TM, WGS84_DD, detect_sr_from_geojson, validate_coordinates_magnitude
+try:
+    from isal import isal_zlib  # optional SIMD DEFLATE (python-isal)
+except ImportError:
+    isal_zlib = None
+
+from .logging_config import install_queue_logging, worker_log_queue
+from .sr_utils import (
+    SWEREF99_TM,
+    WGS84_DD,
+    detect_sr_from_geojson,
+    first_coordinate_pair,
+    spatial_reference,
+    validate_coordinates_magnitude,
+)
+from .staging_index import invalidate_staging_index
 
 # Lazy ArcPy usage: import inside functions to avoid heavy init before logging
-from .utils import make_arcpy_safe_name
-
-
-def _flatten_coordinates(coords):
-    """Flatten nested coordinate arrays to a flat list of numbers."""
-    if not coords:
-        return []
-
-    flat = []
-    for item in coords:
-        if isinstance(item, (list, tuple)):
-            flat.extend(_flatten_coordinates(item))
-        else:
-            flat.append(item)
-    return flat
-
-
-def _dominant_geometry_type(features: list) -> str | None:
-    """Return the most frequent GeoJSON geometry type among features."""
-    counts = {}
+from .utils import json_loads, make_arcpy_safe_name
+
+# zipfile inflates through its module-level zlib reference; ISA-L's drop-in
+# module is 2-4x faster there. The pipeline only reads archives
+if isal_zlib is not None:
+    zipfile.zlib = isal_zlib
+
+# Read buffer for staged ZIP archives; zipfile's many small header/seek reads
+# otherwise go through the 8 KB default
+ZIP_READ_BUFFER = 1024 * 1024
+
+# Uncompressed size from which a candidate's members are extracted on
+# several threads (zlib releases the GIL while inflating)
+PARALLEL_EXTRACT_MIN_BYTES = 64 * 1024 * 1024
+
+# Importable suffixes in priority order (lower wins on equal mtimes)
+IMPORT_PRIORITY = {
+    '.gpkg': 0,     # GeoPackage files (usually best quality)
+    '.geojson': 1,  # GeoJSON (from REST/OGC/WFS)
+    '.json': 2,     # Esri JSON (from REST)
+    '.shp': 3,      # Shapefiles
+    '.zip': 4,      # ZIP archives (may contain shapefiles/gpkg)
+}
+
+
+def _geometry_type_counts(features: list) -> Counter:
+    """Count GeoJSON geometry types among features."""
+    counts: Counter = Counter()
     for f in features or []:
         try:
-            g = f.get("geometry") or {}
-            gt = g.get("type")
+            gt = (f.get("geometry") or {}).get("type")
             if isinstance(gt, str):
-                counts[gt] = counts.get(gt, 0) + 1
+                counts[gt] += 1
         except Exception:
             continue
-    return None if not counts else max(counts.items(), key=lambda kv: kv[1])[0]
+    return counts
+
+
+def _dominant_geometry_type(features: list, counts: Counter | None = None) -> str | None:
+    """Return the most frequent GeoJSON geometry type among features."""
+    if counts is None:
+        counts = _geometry_type_counts(features)
+    return counts.most_common(1)[0][0] if counts else None
 
 
 def _filter_features_by_geometry_type(features: list, geom_type: str) -> list:
@@ -225,14 +258,21 @@ def stage_all_downloads(cfg: dict) -> None:
 
     logging.info(f"[STAGE] Starting staging from {downloads_dir}")
 
+    # Staging adds/removes feature classes, so any cached listing is stale
+    invalidate_staging_index(gdb_path)
+
     # Ensure staging GDB exists
     ensure_gdb_exists(gdb_path)
 
-    # Clear staging GDB if configured
-    if cfg.get('cleanup_staging_before_run', False):
+    # Clear staging GDB if configured; a freshly cleared GDB holds nothing
+    # to replace, so the per-import existence check/delete can be skipped
+    cleared = bool(cfg.get('cleanup_staging_before_run', False))
+    if cleared:
         clear_staging_gdb(gdb_path)
 
-    imported_count = 0
+    # Collect imports per staging name; files sharing a name are imported in
+    # order by one worker so the last one wins, as in a sequential run
+    jobs: dict[str, list[Path]] = {}
 
     # Process each authority directory
     for authority_dir in downloads_dir.iterdir():
@@ -246,47 +286,92 @@ def stage_all_downloads(cfg: dict) -> None:
         files_found = discover_files(authority_dir)
         logging.info(f"[STAGE] Found {len(files_found)} files in {authority_name}")
 
-        # Import each file
         for file_path in files_found:
-            safe_name = create_safe_name(file_path, authority_name)
-            if import_file_to_staging(
-                file_path, gdb_path, safe_name
-            ):
+            jobs.setdefault(create_safe_name(file_path, authority_name), []).append(file_path)
+
+    # performance.parallel_staging: import staging names concurrently, one
+    # process (own arcpy session) per worker; workers from parallel_workers
+    perf = cfg.get('performance', {})
+    workers = 1
+    if perf.get('parallel_staging', False):
+        workers = max(1, min(int(perf.get('parallel_workers', 1) or 1), os.cpu_count() or 1, len(jobs)))
+
+    items = [(safe_name, file_paths, gdb_path, not cleared) for safe_name, file_paths in jobs.items()]
+    if workers > 1:
+        logging.info(f"[STAGE] Importing {len(items)} datasets with {workers} processes")
+        with worker_log_queue() as log_queue, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_stage_worker,
+                                    initargs=(log_queue, logging.getLogger().level)) as executor:
+            results = list(executor.map(_stage_group, items))
+    else:
+        # Importers (and their _proj intermediates) overwrite their outputs;
+        # scoped so later steps keep the caller's overwriteOutput setting
+        with _stage_environment():
+            results = list(map(_stage_group, items))
+
+    imported_count = 0
+    for outcomes in results:
+        for file_name, safe_name, success in outcomes:
+            if success:
                 imported_count += 1
-                logging.info(f"[STAGE] + {file_path.name} -> {safe_name}")
+                logging.info(f"[STAGE] + {file_name} -> {safe_name}")
             else:
-                logging.warning(f"[STAGE] ✗ Failed: {file_path.name}")
+                logging.warning(f"[STAGE] ✗ Failed: {file_name}")
 
+    invalidate_staging_index(gdb_path)
     logging.info(f"[STAGE] Completed: {imported_count} files imported to staging")
 
+def _stage_environment():
+    """arcpy environment for staging imports, restored when the with-block exits."""
+    import arcpy  # lazy import
+    return arcpy.EnvManager(overwriteOutput=True)
+
+
+def _init_stage_worker(log_queue, log_level: int = logging.NOTSET) -> None:
+    """Set up a staging worker process: queue logging and arcpy environment."""
+    install_queue_logging(log_queue, log_level)
+    import arcpy  # lazy import
+    # The worker only runs staging imports and exits with the pool, so the
+    # setting is left in place rather than scoped
+    arcpy.env.overwriteOutput = True
+
+
+def _stage_group(item: tuple[str, list[Path], str, bool]) -> list[tuple[str, str, bool]]:
+    """Import the files for one staging name in order; returns (file name, staging name, success)."""
+    safe_name, file_paths, gdb_path, replace_existing = item
+    return [(file_path.name, safe_name,
+             import_file_to_staging(file_path, gdb_path, safe_name, replace_existing=replace_existing))
+            for file_path in file_paths]
+
+
 def discover_files(directory: Path) -> list[Path]:
     """Find all files we can import, with smart prioritization."""
+    # One scandir walk over the tree; (mtime, priority, path) per importable file
     candidates = []
-
-    # Search patterns in priority order
-    patterns = [
-        '*.gpkg',     # GeoPackage files (usually best quality)
-        '*.geojson',  # GeoJSON (from REST/OGC/WFS)
-        '*.json',     # Esri JSON (from REST)
-        '*.shp',      # Shapefiles
-        '*.zip'       # ZIP archives (may contain shapefiles/gpkg)
-    ]
-
-    for pattern in patterns:
-        # Search recursively in directory
-        found = list(directory.rglob(pattern))
-        candidates.extend(found)
-
-    # Remove duplicates and sort by modification time (newest first)
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                    continue
+                name = entry.name.lower()
+                suffix = os.path.splitext(name)[1]
+                priority = IMPORT_PRIORITY.get(suffix)
+                if priority is None:
+                    continue
+                # Skip legacy paginated files like part_001.geojson
+                if suffix in ('.geojson', '.json') and name.startswith('part_'):
+                    continue
+                candidates.append((entry.stat().st_mtime, priority, Path(entry.path)))
+
+    # Newest first; equal mtimes fall back to suffix priority
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+
+    # Use file stem to avoid duplicate processing of same dataset
     unique_files = []
     seen_stems = set()
-
-    for file_path in sorted(candidates, key=lambda p: p.stat().st_mtime, reverse=True):
-        # Skip legacy paginated files like part_001.geojson
-        fname = file_path.name.lower()
-        if (fname.endswith('.geojson') or fname.endswith('.json')) and fname.startswith('part_'):
-            continue
-        # Use file stem to avoid duplicate processing of same dataset
+    for _, _, file_path in candidates:
         stem_key = file_path.stem.lower()
         if stem_key not in seen_stems:
             unique_files.append(file_path)
@@ -313,15 +398,22 @@ def create_safe_name(file_path: Path, authority: str) -> str:
 
     return make_arcpy_safe_name(f"{norm_auth}_{norm_stem}")
 
-def import_file_to_staging(file_path: Path, gdb_path: str, staging_name: str) -> bool:
-    """Import any supported file type to staging GDB."""
+def import_file_to_staging(file_path: Path, gdb_path: str, staging_name: str,
+                           replace_existing: bool = True) -> bool:
+    """Import any supported file type to staging GDB.
+
+    replace_existing=False skips removing a previous feature class of the same
+    name (for a staging GDB cleared at the start of the run).
+    """
     out_fc = f"{gdb_path.replace(chr(92), '/')}/{staging_name}"
 
-    # Clean up existing feature class (best effort)
-    with contextlib.suppress(Exception):
-        import arcpy
-        if arcpy.Exists(out_fc):
-            arcpy.management.Delete(out_fc)
+    # Clean up existing feature class (best effort), so a failed import never
+    # leaves a previous run's data behind
+    if replace_existing:
+        with contextlib.suppress(Exception):
+            import arcpy
+            if arcpy.Exists(out_fc):
+                arcpy.management.Delete(out_fc)
     try:
         # Route to appropriate importer based on file type
         suffix = file_path.suffix.lower()
@@ -344,47 +436,50 @@ def import_file_to_staging(file_path: Path, gdb_path: str, staging_name: str) ->
         logging.error(f"[STAGE] Import failed for {file_path.name}: {e}")
         return False
 
+def _copy_to_staging(src: str, out_fc: str, label: str):
+    """Write src to out_fc, projecting to SWEREF99 TM in the same tool call when
+    the source SR is known and differs. Returns the source spatial reference.
+
+    Replaces copy + Describe + Project + Delete + Rename with Describe + Project.
+    """
+    import arcpy  # lazy import
+    current_sr = arcpy.Describe(src).spatialReference
+    known = current_sr.name and current_sr.name != "Unknown"
+    if known and current_sr.factoryCode and current_sr.factoryCode != SWEREF99_TM:
+        try:
+            arcpy.management.Project(src, out_fc, spatial_reference(SWEREF99_TM))
+            logging.info(f"[STAGE] Projected {label} from EPSG:{current_sr.factoryCode} to EPSG:{SWEREF99_TM}")
+            return current_sr
+        except Exception as e:
+            # Keep original SR if projection fails
+            logging.warning(f"[STAGE] Projection failed for {label}: {e}")
+
+    arcpy.conversion.FeatureClassToFeatureClass(src, str(Path(out_fc).parent), Path(out_fc).name)
+    return current_sr
+
+
 def import_gpkg(gpkg_path: Path, out_fc: str) -> bool:
     """Import GPKG using actual layer discovery."""
     try:
         import arcpy
-        # Discover actual layers in the GPKG
-        layers = discover_gpkg_layers(gpkg_path)
-
-        if not layers:
-            logging.error(f"[STAGE] No layers found in {gpkg_path.name}")
-            return False
-
-        # Import first valid layer
-        for layer_name in layers:
+        # Import first valid layer; layers are discovered lazily, so the walk
+        # stops at the first one that imports
+        found = False
+        for layer_name in discover_gpkg_layers(gpkg_path):
+            found = True
             try:
-                # Use backslash format for ArcPy GPKG references
-                layer_ref = f"{gpkg_path}\\{layer_name}"
-
-                arcpy.conversion.FeatureClassToFeatureClass(
-                    layer_ref,
-                    str(Path(out_fc).parent),
-                    Path(out_fc).name
-                )
+                # Workspace-style reference (GPKG as workspace, layer as child),
+                # resolved directly rather than parsed as a layer URI
+                layer_ref = os.path.join(str(gpkg_path), layer_name)
 
-                # Ensure proper SR definition and project if needed
-                desc = arcpy.Describe(out_fc)
-                current_sr = desc.spatialReference
+                # Copy (projecting to SWEREF99 TM in the same call if needed)
+                current_sr = _copy_to_staging(layer_ref, out_fc, f"GPKG layer {layer_name}")
 
+                # Ensure proper SR definition
                 if current_sr.name == "Unknown" or not current_sr.name:
                     logging.warning(f"[STAGE] Unknown SR in GPKG layer {layer_name}, assuming SWEREF99 TM")
-                    sr = arcpy.SpatialReference(SWEREF99_TM)
+                    sr = spatial_reference(SWEREF99_TM)
                     arcpy.management.DefineProjection(out_fc, sr)
-                elif current_sr.factoryCode and current_sr.factoryCode != SWEREF99_TM:
-                    # Project to SWEREF99 TM
-                    projected_fc = f"{out_fc}_proj"
-                    try:
-                        arcpy.management.Project(out_fc, projected_fc, SWEREF99_TM)
-                        arcpy.management.Delete(out_fc)
-                        arcpy.management.Rename(projected_fc, out_fc)
-                        logging.info(f"[STAGE] Projected GPKG layer from EPSG:{current_sr.factoryCode} to EPSG:{SWEREF99_TM}")
-                    except Exception as e:
-                        logging.warning(f"[STAGE] Projection failed for GPKG layer: {e}")
 
                 logging.debug(f"[STAGE] Imported GPKG layer: {layer_name}")
                 return True
@@ -393,59 +488,80 @@ def import_gpkg(gpkg_path: Path, out_fc: str) -> bool:
                 logging.debug(f"[STAGE] Layer {layer_name} failed: {e}")
                 continue
 
-        logging.error(f"[STAGE] No importable layers in {gpkg_path.name}")
+        if not found:
+            logging.error(f"[STAGE] No layers found in {gpkg_path.name}")
+        else:
+            logging.error(f"[STAGE] No importable layers in {gpkg_path.name}")
         return False
 
     except Exception as e:
         logging.error(f"[STAGE] GPKG import failed: {e}")
         return False
 
-def discover_gpkg_layers(gpkg_path: Path) -> list[str]:
-    """Discover actual layer names in a GPKG file."""
-    layers = []
+def _gpkg_catalog_layers(gpkg_path: Path) -> list[str]:
+    """Feature tables listed in gpkg_contents, non-empty ones first ([] if unreadable)."""
+    try:
+        uri = f"{gpkg_path.resolve().as_uri()}?mode=ro"
+        with contextlib.closing(sqlite3.connect(uri, uri=True)) as conn:
+            names = [row[0] for row in conn.execute(
+                "SELECT table_name FROM gpkg_contents WHERE data_type = 'features'")]
+            empty = set()
+            for name in names:
+                quoted = name.replace('"', '""')
+                if not conn.execute(f'SELECT EXISTS (SELECT 1 FROM "{quoted}")').fetchone()[0]:
+                    empty.add(name)
+    except sqlite3.Error as e:
+        logging.debug(f"[STAGE] GPKG catalog unreadable for {gpkg_path.name}: {e}")
+        return []
+    return sorted(names, key=lambda n: n in empty)
+
+
+def discover_gpkg_layers(gpkg_path: Path) -> Iterator[str]:
+    """Yield actual layer names in a GPKG file as they are discovered."""
+    seen: set[str] = set()
+
+    # Method 1: Read the GeoPackage catalog with sqlite3 (no arcpy workspace
+    # open); layers holding rows first, probed with EXISTS rather than counted
+    layers = _gpkg_catalog_layers(gpkg_path)
+    if layers:
+        yield from layers
+        return
 
     try:
         import arcpy
-        # Method 1: Use arcpy.da.Walk (most reliable)
+        # Method 2: Use arcpy.da.Walk
         for dirpath, dirnames, filenames in arcpy.da.Walk(str(gpkg_path), datatype="FeatureClass"):
+            dirnames[:] = [d for d in dirnames if not d.startswith("_")]
             for filename in filenames:
                 # Clean layer name (remove main. prefix if present)
                 clean_name = filename.replace("main.", "")
-                if clean_name not in layers:
-                    layers.append(clean_name)
+                if clean_name not in seen:
+                    seen.add(clean_name)
+                    yield clean_name
 
-        # Method 2: Use arcpy.Describe as fallback
-        if not layers:
+        # Method 3: Use arcpy.Describe as fallback
+        if not seen:
             with contextlib.suppress(Exception):
                 desc = arcpy.Describe(str(gpkg_path))
                 if hasattr(desc, 'children'):
                     for child in desc.children:
                         if hasattr(child, 'name'):
                             clean_name = child.name.replace("main.", "")
-                            if clean_name not in layers:
-                                layers.append(clean_name)
-        logging.debug(f"[STAGE] GPKG {gpkg_path.name} layers: {layers}")
-        return layers
+                            if clean_name not in seen:
+                                seen.add(clean_name)
+                                yield clean_name
 
     except Exception as e:
         logging.debug(f"[STAGE] Failed to discover GPKG layers: {e}")
-        return []
 
 def import_shapefile(shp_path: Path, out_fc: str) -> bool:
     """Import shapefile with SR validation and projection."""
     try:
         import arcpy
-        # Import shapefile
-        arcpy.conversion.FeatureClassToFeatureClass(
-            str(shp_path),
-            str(Path(out_fc).parent),
-            Path(out_fc).name
-        )
-
-        # Check and fix SR if needed
-        desc = arcpy.Describe(out_fc)
-        current_sr = desc.spatialReference
+        # Import shapefile (projecting to SWEREF99 TM in the same call if needed)
+        current_sr = _copy_to_staging(str(shp_path), out_fc, shp_path.name)
 
+        # Fix SR if it was unknown
         if current_sr.name == "Unknown" or not current_sr.name:
             logging.warning(f"[STAGE] Unknown SR in {shp_path.name}, checking for .prj file")
             prj_path = shp_path.with_suffix('.prj')
@@ -455,22 +571,22 @@ def import_shapefile(shp_path: Path, out_fc: str) -> bool:
                 logging.info(f"[STAGE] Defined SR from .prj for {shp_path.name}")
             else:
                 # Assume SWEREF99 TM for Swedish data
-                sr = arcpy.SpatialReference(SWEREF99_TM)
+                sr = spatial_reference(SWEREF99_TM)
                 arcpy.management.DefineProjection(out_fc, sr)
                 logging.warning(f"[STAGE] No .prj file, assumed EPSG:{SWEREF99_TM} for {shp_path.name}")
 
-        # Project to SWEREF99 TM if needed
-        desc = arcpy.Describe(out_fc)  # Re-describe to get updated SR
-        current_sr = desc.spatialReference
-        if current_sr.factoryCode and current_sr.factoryCode != SWEREF99_TM:
-            projected_fc = f"{out_fc}_proj"
-            try:
-                arcpy.management.Project(out_fc, projected_fc, SWEREF99_TM)
-                arcpy.management.Delete(out_fc)
-                arcpy.management.Rename(projected_fc, out_fc)
-                logging.info(f"[STAGE] Projected {shp_path.name} from EPSG:{current_sr.factoryCode} to EPSG:{SWEREF99_TM}")
-            except Exception as e:
-                logging.warning(f"[STAGE] Projection failed for {shp_path.name}: {e}")
+            # Project to SWEREF99 TM if the .prj defined another SR
+            desc = arcpy.Describe(out_fc)  # Re-describe to get updated SR
+            current_sr = desc.spatialReference
+            if current_sr.factoryCode and current_sr.factoryCode != SWEREF99_TM:
+                projected_fc = f"{out_fc}_proj"
+                try:
+                    arcpy.management.Project(out_fc, projected_fc, SWEREF99_TM)
+                    arcpy.management.Delete(out_fc)
+                    arcpy.management.Rename(projected_fc, out_fc)
+                    logging.info(f"[STAGE] Projected {shp_path.name} from EPSG:{current_sr.factoryCode} to EPSG:{SWEREF99_TM}")
+                except Exception as e:
+                    logging.warning(f"[STAGE] Projection failed for {shp_path.name}: {e}")
 
         return True
     except Exception as e:
@@ -481,10 +597,8 @@ def import_geojson(geojson_path: Path, out_fc: str) -> bool:
     """Import GeoJSON via ArcPy JSONToFeatures with SR validation and projection."""
     try:
         import arcpy
-        # First, validate and detect SR from GeoJSON
-        with open(geojson_path, 'r', encoding='utf-8') as f:
-            import json
-            geojson_data = json.load(f)
+        # First, validate and detect SR from GeoJSON (bytes parse; orjson when installed)
+        geojson_data = json_loads(geojson_path.read_bytes())
 
         detected_sr = detect_sr_from_geojson(geojson_data)
         if not detected_sr:
@@ -494,23 +608,20 @@ def import_geojson(geojson_path: Path, out_fc: str) -> bool:
         if features := geojson_data.get('features', []):
             first_geom = features[0].get('geometry', {})
             if coords := first_geom.get('coordinates'):
-                flat_coords = _flatten_coordinates(coords)
-                if flat_coords and not validate_coordinates_magnitude(flat_coords[:2], detected_sr):
+                xy = first_coordinate_pair(coords)
+                if xy and not validate_coordinates_magnitude(xy, detected_sr):
                     logging.error(f"[STAGE] Invalid coordinate magnitudes in {geojson_path.name}")
                     return False
 
         # Enhanced geometry check and filtering for all GeoJSON (especially OGC sources)
-        dominant = _dominant_geometry_type(features)
+        geom_counts = _geometry_type_counts(features)
+        dominant = _dominant_geometry_type(features, geom_counts)
         json_input_path = geojson_path
         temp_path = None
 
         # Log geometry type distribution for better debugging
         if features:
-            geom_counts = {}
-            for f in features:
-                if geom_type := (f.get("geometry") or {}).get("type"):
-                    geom_counts[geom_type] = geom_counts.get(geom_type, 0) + 1
-            logging.info(f"[STAGE] {geojson_path.name} geometry types: {geom_counts}")
+            logging.info(f"[STAGE] {geojson_path.name} geometry types: {dict(geom_counts)}")
 
         if dominant:
             logging.info(f"[STAGE] Dominant geometry type for {geojson_path.name}: {dominant}")
@@ -541,7 +652,7 @@ def import_geojson(geojson_path: Path, out_fc: str) -> bool:
 
         # Import via robust JSONToFeatures with geometry type validation
         if dominant:
-            success = _import_geojson_robust(json_input_path, out_fc, dominant, arcpy.SpatialReference(detected_sr))
+            success = _import_geojson_robust(json_input_path, out_fc, dominant, spatial_reference(detected_sr))
             if not success:
                 logging.error(f"[STAGE] Robust import failed for {geojson_path.name}")
                 return False
@@ -633,7 +744,7 @@ def _ensure_fc_spatial_reference(fc_path: str, epsg_code: int):
 
         if current_sr.name == "Unknown" or not current_sr.name:
             # Define projection if unknown
-            sr = arcpy.SpatialReference(epsg_code)
+            sr = spatial_reference(epsg_code)
             arcpy.management.DefineProjection(fc_path, sr)
             logging.info(f"[STAGE] Defined SR {epsg_code} for {fc_path}")
         else:
@@ -642,35 +753,84 @@ def _ensure_fc_spatial_reference(fc_path: str, epsg_code: int):
     except Exception as e:
         logging.warning(f"[STAGE] Failed to ensure SR for {fc_path}: {e}")
 
+def _extract_slice(zip_path: Path, names: list, extract_dir: Path) -> list:
+    """Extract names from zip_path through a handle of this thread's own."""
+    with open(zip_path, 'rb', buffering=ZIP_READ_BUFFER) as raw, zipfile.ZipFile(raw, 'r') as zf:
+        return [(m, Path(zf.extract(m, extract_dir))) for m in names]
+
+
+def _extract_members(zip_path: Path, zf: zipfile.ZipFile, names: list, extract_dir: Path) -> dict:
+    """Extract names, spreading large sets over threads. Returns {name: path}.
+
+    Members whose path would land outside extract_dir ("../", absolute) are
+    skipped and logged, before any directory is created for them.
+    """
+    root = extract_dir.resolve()
+    safe = []
+    for m in names:
+        if (root / m).resolve().is_relative_to(root):
+            safe.append(m)
+        else:
+            logging.warning(f"[STAGE] Skipping ZIP member outside extract dir: {m}")
+    names = safe
+    workers = min(len(names), os.cpu_count() or 1)
+    if workers < 2 or sum(zf.getinfo(m).file_size for m in names) < PARALLEL_EXTRACT_MIN_BYTES:
+        return {m: Path(zf.extract(m, extract_dir)) for m in names}
+
+    # Largest first, dealt round-robin, so each thread gets a similar share;
+    # ZipFile is not safe for concurrent reads, so each thread opens its own
+    ordered = sorted(names, key=lambda m: zf.getinfo(m).file_size, reverse=True)
+    for m in ordered:
+        (extract_dir / m).parent.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        slices = pool.map(_extract_slice, [zip_path] * workers,
+                          [ordered[i::workers] for i in range(workers)], [extract_dir] * workers)
+        return {m: path for part in slices for m, path in part}
+
+
 def import_zip(zip_path: Path, out_fc: str) -> bool:
     """Extract ZIP and import first valid dataset."""
     extract_dir = zip_path.parent / f"_extract_{zip_path.stem}"
 
     try:
-        # Extract ZIP contents
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            zf.extractall(extract_dir)
-
-        # Find importable files in extraction (priority: GPKG > SHP)
-        candidates = []
-        candidates.extend(extract_dir.rglob('*.gpkg'))
-        candidates.extend(extract_dir.rglob('*.shp'))
-
-        # Try importing first valid file
-        for candidate in candidates:
-            try:
-                if candidate.suffix.lower() == '.gpkg':
-                    success = import_gpkg(candidate, out_fc)
-                else:  # .shp
-                    success = import_shapefile(candidate, out_fc)
-
-                if success:
-                    logging.debug(f"[STAGE] ZIP imported: {candidate.name}")
-                    return True
+        with open(zip_path, 'rb', buffering=ZIP_READ_BUFFER) as raw, zipfile.ZipFile(raw, 'r') as zf:
+            # Classify on the already-parsed central directory, lower-casing only
+            # the suffix of each name rather than copying every full name
+            infos = zf.infolist()
+            gpkgs, shps = [], []
+            for info in infos:
+                name = info.filename
+                if name[-5:].lower() == '.gpkg':
+                    gpkgs.append(name)
+                elif name[-4:].lower() == '.shp':
+                    shps.append(name)
+
+            # Try importing first valid file (GPKG > SHP), extracting each candidate
+            # only when it is tried so later ones are never written if an earlier
+            # one imports. Shapefile sidecars are looked up only for tried members;
+            # "dir/roads." matches roads.dbf, roads.shp.xml
+            for member in gpkgs + shps:
+                try:
+                    if member in gpkgs:
+                        needed = [member]
+                    else:
+                        prefix = member[:-3].lower()
+                        needed = [i.filename for i in infos
+                                  if not i.is_dir() and i.filename[:len(prefix)].lower() == prefix]
+                    extracted = _extract_members(zip_path, zf, needed, extract_dir)
+                    candidate = extracted[member]
+                    if candidate.suffix.lower() == '.gpkg':
+                        success = import_gpkg(candidate, out_fc)
+                    else:  # .shp
+                        success = import_shapefile(candidate, out_fc)
+
+                    if success:
+                        logging.debug(f"[STAGE] ZIP imported: {candidate.name}")
+                        return True
 
-            except Exception as e:
-                logging.debug(f"[STAGE] ZIP candidate failed: {e}")
-                continue
+                except Exception as e:
+                    logging.debug(f"[STAGE] ZIP candidate failed: {e}")
+                    continue
 
         logging.warning(f"[STAGE] No importable data in {zip_path.name}")
         return False
@@ -708,16 +868,20 @@ def clear_staging_gdb(gdb_path: str) -> None:
         feature_classes = []
         import arcpy
         for dirpath, dirnames, filenames in arcpy.da.Walk(gdb_path, datatype="FeatureClass"):
-            feature_classes.extend(filenames)
+            dirnames[:] = [d for d in dirnames if not d.startswith("_")]
+            feature_classes.extend(os.path.join(dirpath, f) for f in filenames)
 
-        # Delete each feature class
-        for fc in feature_classes:
+        # Walk just listed them, so skip Exists and delete them in one call;
+        # fall back to one at a time so a locked class doesn't block the rest
+        if feature_classes:
             try:
-                fc_path = f"{gdb_path}/{fc}"
-                if arcpy.Exists(fc_path):
-                    arcpy.management.Delete(fc_path)
-            except Exception as e:
-                logging.debug(f"[STAGE] Failed to delete {fc}: {e}")
+                arcpy.management.Delete(feature_classes)
+            except Exception:
+                for fc_path in feature_classes:
+                    try:
+                        arcpy.management.Delete(fc_path)
+                    except Exception as e:
+                        logging.debug(f"[STAGE] Failed to delete {Path(fc_path).name}: {e}")
 
         logging.info(f"[STAGE] Cleared {len(feature_classes)} feature classes from staging")
 
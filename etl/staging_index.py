@@ -0,0 +1,28 @@
+"""Shared listing of staging feature classes for the process and load steps.
+
+Staging adds and removes feature classes, so it invalidates the listing when it
+finishes; processing invalidates it only when a replace failed and may have
+left a feature class deleted. Otherwise the process step's listing is reused
+by the load step.
+"""
+from typing import Optional, Tuple
+
+from .utils import list_gdb_feature_classes
+
+_index: dict[str, Tuple[Tuple[str, str, str], ...]] = {}
+
+
+def get_staging_feature_classes(staging_gdb: str, refresh: bool = False) -> Tuple[Tuple[str, str, str], ...]:
+    """Return (full_path, relative_path, name) for every staged feature class, listing once."""
+    key = str(staging_gdb)
+    if refresh or key not in _index:
+        _index[key] = tuple(list_gdb_feature_classes(key))
+    return _index[key]
+
+
+def invalidate_staging_index(staging_gdb: Optional[str] = None) -> None:
+    """Forget the listing for one staging GDB, or for all of them when None."""
+    if staging_gdb is None:
+        _index.clear()
+    else:
+        _index.pop(str(staging_gdb), None)
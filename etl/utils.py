@@ -2,12 +2,25 @@
 
 Keep these helpers minimal: choose best candidate by feature count.
 """
+import json
 import logging
 import re
 import sys
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+try:
+    import orjson  # optional C accelerator for JSON
+except ImportError:
+    orjson = None
+
+# Lowercase ASCII -> itself for [a-z0-9], underscore for everything else
+_ASCII_SAFE_TABLE = str.maketrans({
+    chr(i): (chr(i) if chr(i).isdigit() or 'a' <= chr(i) <= 'z' else '_') for i in range(128)
+})
+_MULTI_UNDERSCORE_RE = re.compile(r'_+')
 
 
 def best_shapefile_by_count(paths: List[Path]) -> Optional[Path]:
@@ -38,6 +51,26 @@ def best_shapefile_by_count(paths: List[Path]) -> Optional[Path]:
 
     return best if best_count > 0 else None
 
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # stdlib also accepts NaN/Infinity and >64-bit ints
+    return json.loads(data)
+
+
+def json_dumps_bytes(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass  # e.g. non-str keys or >64-bit ints; let stdlib handle it
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
 def get_logger(name: str = "op-etl") -> logging.Logger:
     """Get a logger for the op-etl package.
     
@@ -53,6 +86,7 @@ def log_http_request(log: logging.Logger, session, method: str, url: str, **kwar
     return response
 
 
+@lru_cache(maxsize=4096)
 def make_arcpy_safe_name(name: str, max_length: int = 100) -> str:
     """Create ArcPy-safe feature class names that always work.
 
@@ -68,24 +102,25 @@ def make_arcpy_safe_name(name: str, max_length: int = 100) -> str:
     if not name:
         return "unnamed_fc"
 
-    # Normalize unicode and remove all accents
-    normalized = unicodedata.normalize('NFD', name)
-    ascii_name = ''.join(c for c in normalized if unicodedata.category(c) != 'Mn')
-
-    # Convert to ASCII, handling any remaining issues
-    try:
-        ascii_name = ascii_name.encode('ascii', 'ignore').decode('ascii')
-    except Exception:
-        ascii_name = "converted_name"
+    if name.isascii():
+        # Plain ASCII (most source names): nothing to decompose or strip
+        ascii_name = name
+    else:
+        # Decompose accents, then drop every non-ASCII code point (combining
+        # marks included) in one C-level encode instead of a per-char filter
+        try:
+            ascii_name = unicodedata.normalize('NFD', name).encode('ascii', 'ignore').decode('ascii')
+        except Exception:
+            ascii_name = "converted_name"
 
     # Clean for ArcPy rules
     clean = ascii_name.lower().strip()
 
-    # Replace any non-alphanumeric with underscore
-    clean = re.sub(r'[^a-z0-9]', '_', clean)
+    # Replace any non-alphanumeric with underscore (input is ASCII here)
+    clean = clean.translate(_ASCII_SAFE_TABLE)
 
     # Remove multiple underscores
-    clean = re.sub(r'_+', '_', clean)
+    clean = _MULTI_UNDERSCORE_RE.sub('_', clean)
 
     # Remove leading/trailing underscores
     clean = clean.strip('_')
@@ -126,3 +161,62 @@ def safe_fc_path(gdb_path: str, fc_name: str) -> str:
     safe_name = make_arcpy_safe_name(fc_name)
     # Use forward slashes for ArcPy compatibility
     return f"{gdb_path.replace(chr(92), '/')}/{safe_name}"
+
+
+# arcpy.Exists results memoised for the duration of one pipeline step; each
+# step's run() clears it on entry and callers forget paths they create/delete
+_exists_cache: dict[str, bool] = {}
+
+
+def cached_exists(path: str) -> bool:
+    """arcpy.Exists with a per-run memo for paths probed repeatedly (AOI, SDE datasets)."""
+    key = str(path)
+    hit = _exists_cache.get(key)
+    if hit is None:
+        import arcpy
+        hit = _exists_cache[key] = bool(arcpy.Exists(key))
+    return hit
+
+
+def forget_exists(path: Optional[str] = None) -> None:
+    """Drop one memoised arcpy.Exists result, or all of them when path is None."""
+    if path is None:
+        _exists_cache.clear()
+    else:
+        _exists_cache.pop(str(path), None)
+
+
+def iter_gdb_feature_classes(gdb_path: str) -> Iterator[Tuple[str, str, str]]:
+    """Yield feature classes in a geodatabase as (full_path, relative_path, name).
+
+    Uses ListFeatureClasses/ListDatasets (one catalog call per level) rather
+    than recursing with arcpy.da.Walk, and yields each level as soon as it is
+    listed. Feature classes inside feature datasets get a relative path of
+    ``dataset/name``; datasets whose names start with "_" are not descended.
+    """
+    import arcpy
+
+    gdb = str(gdb_path).rstrip("/\\")
+    # EnvManager restores the previous workspace; it is never held across a
+    # yield, so consumers can run other arcpy tools while iterating
+    with arcpy.EnvManager(workspace=gdb):
+        names = arcpy.ListFeatureClasses() or []
+        datasets = arcpy.ListDatasets(feature_type="Feature") or []
+    # Path prefixes are built once per container, not per feature class
+    prefix = f"{gdb}/"
+    for name in names:
+        yield prefix + name, name, name
+    for ds in datasets:
+        if ds.startswith("_"):
+            continue  # reserved/scratch container; staged names never start with "_"
+        with arcpy.EnvManager(workspace=gdb):
+            names = arcpy.ListFeatureClasses(feature_dataset=ds) or []
+        rel_prefix = f"{ds}/"
+        ds_prefix = prefix + rel_prefix
+        for name in names:
+            yield ds_prefix + name, rel_prefix + name, name
+
+
+def list_gdb_feature_classes(gdb_path: str) -> List[Tuple[str, str, str]]:
+    """List all feature classes in a geodatabase; see iter_gdb_feature_classes."""
+    return list(iter_gdb_feature_classes(gdb_path))
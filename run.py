@@ -9,8 +9,11 @@ import time
 from pathlib import Path
 
 from etl.config import ConfigError, load_config
+from etl.logging_config import flush_logging, shutdown_logging
 from etl.paths import ensure_workspaces
 
+log = logging.getLogger("etl.pipeline")
+
 
 def clear_arcpy_caches():
     """Clear ArcPy internal caches and reset workspace to avoid locks."""
@@ -41,7 +44,7 @@ def clear_arcpy_caches():
         time.sleep(0.5)
 
     except Exception as e:
-        logging.debug(f"Error clearing ArcPy caches: {e}")
+        log.debug(f"Error clearing ArcPy caches: {e}")
 
 
 def remove_geodatabase_safely(gdb_path):
@@ -53,7 +56,7 @@ def remove_geodatabase_safely(gdb_path):
     if not gdb_path.exists():
         return True
 
-    logging.info(f"Removing geodatabase: {gdb_path}")
+    log.info(f"Removing geodatabase: {gdb_path}")
 
     # Step 1: Clear ArcPy caches first
     clear_arcpy_caches()
@@ -62,13 +65,13 @@ def remove_geodatabase_safely(gdb_path):
     try:
         import arcpy  # Lazy import
         if arcpy.Exists(str(gdb_path)):
-            logging.debug("Using ArcPy Delete management tool")
+            log.debug("Using ArcPy Delete management tool")
             arcpy.management.Delete(str(gdb_path))
             if not gdb_path.exists():
-                logging.info("Successfully removed geodatabase using ArcPy")
+                log.info("Successfully removed geodatabase using ArcPy")
                 return True
     except Exception as e:
-        logging.debug(f"ArcPy Delete failed: {e}")
+        log.debug(f"ArcPy Delete failed: {e}")
 
     # Step 3: Try standard filesystem removal with retries
     def handle_remove_readonly(func, path, exc):
@@ -85,15 +88,15 @@ def remove_geodatabase_safely(gdb_path):
             shutil.rmtree(gdb_path, onerror=handle_remove_readonly)
 
             if not gdb_path.exists():
-                logging.info(f"Successfully removed geodatabase (attempt {attempt + 1})")
+                log.info(f"Successfully removed geodatabase (attempt {attempt + 1})")
                 return True
 
         except Exception as e:
-            logging.debug(f"Attempt {attempt + 1} failed: {e}")
+            log.debug(f"Attempt {attempt + 1} failed: {e}")
 
         if attempt < max_attempts - 1:
             wait_time = (attempt + 1) * 0.5  # Increasing delays
-            logging.debug(f"Waiting {wait_time}s before retry...")
+            log.debug(f"Waiting {wait_time}s before retry...")
             time.sleep(wait_time)
 
     # Step 4: Try rename strategy as fallback
@@ -102,23 +105,23 @@ def remove_geodatabase_safely(gdb_path):
         timestamp = int(time.time())
         temp_path = gdb_path.with_name(f"{gdb_path.name}.{timestamp}.old")
 
-        logging.debug(f"Attempting to rename to: {temp_path}")
+        log.debug(f"Attempting to rename to: {temp_path}")
         gdb_path.rename(temp_path)
 
         # Try to remove the renamed directory in background
         try:
             shutil.rmtree(temp_path, ignore_errors=True)
             if not temp_path.exists():
-                logging.info("Successfully removed renamed geodatabase")
+                log.info("Successfully removed renamed geodatabase")
             else:
-                logging.warning(f"Renamed geodatabase to {temp_path} (manual cleanup needed)")
+                log.warning(f"Renamed geodatabase to {temp_path} (manual cleanup needed)")
         except Exception:
-            logging.warning(f"Geodatabase renamed to {temp_path} (remove manually when possible)")
+            log.warning(f"Geodatabase renamed to {temp_path} (remove manually when possible)")
 
         return True
 
     except Exception as rename_error:
-        logging.error(f"Rename strategy failed: {rename_error}")
+        log.error(f"Rename strategy failed: {rename_error}")
 
     # Step 5: Final attempt - clear contents only
     try:
@@ -140,14 +143,14 @@ def remove_geodatabase_safely(gdb_path):
         # Finally try to remove the main directory
         try:
             gdb_path.rmdir()
-            logging.info("Successfully cleared geodatabase directory")
+            log.info("Successfully cleared geodatabase directory")
             return True
         except Exception:
-            logging.warning("Geodatabase contents cleared but directory remains")
+            log.warning("Geodatabase contents cleared but directory remains")
             return False  # Contents cleared but directory still exists
 
     except Exception as final_error:
-        logging.error(f"Final cleanup failed: {final_error}")
+        log.error(f"Final cleanup failed: {final_error}")
         return False
 
 
@@ -165,31 +168,33 @@ def create_clean_staging_gdb(staging_gdb_path):
 
     try:
         import arcpy  # Lazy import
-        logging.info(f"Creating staging geodatabase: {staging_path}")
+        log.info(f"Creating staging geodatabase: {staging_path}")
         arcpy.management.CreateFileGDB(str(staging_dir), gdb_name)
 
         if staging_path.exists():
-            logging.info("Staging geodatabase created successfully")
+            log.info("Staging geodatabase created successfully")
             return True
         else:
-            logging.error("Geodatabase creation appeared to succeed but file doesn't exist")
+            log.error("Geodatabase creation appeared to succeed but file doesn't exist")
             return False
 
     except Exception as e:
-        logging.error(f"Failed to create staging geodatabase: {e}")
+        log.error(f"Failed to create staging geodatabase: {e}")
         return False
 
 
 # Download flow extracted for clarity
 def _run_download(cfg, args):
-    logging.info("Starting download process...")
+    log.info("Starting download process...")
 
-    # Optional source filters
-    sources = cfg["sources"]
-    if args.authority:
-        sources = [s for s in sources if s.get("authority") == args.authority]
-    if args.type:
-        sources = [s for s in sources if s.get("type") == args.type]
+    # Drop disabled sources and apply the optional CLI filters in one pass, so
+    # each downloader only scans sources that can actually run
+    sources = [
+        s for s in cfg["sources"]
+        if s.get("enabled", True)
+        and (not args.authority or s.get("authority") == args.authority)
+        and (not args.type or s.get("type") == args.type)
+    ]
 
     filtered_cfg = cfg.copy()
     filtered_cfg["sources"] = sources
@@ -202,7 +207,7 @@ def _run_download(cfg, args):
     download_wfs.run(filtered_cfg)
     download_rest.run(filtered_cfg)
 
-    logging.info("Starting staging process...")
+    log.info("Starting staging process...")
     from etl.stage_files import stage_all_downloads
     stage_all_downloads(filtered_cfg)
 
@@ -214,18 +219,20 @@ def _run_download(cfg, args):
 
     patterns = get_error_patterns()
     if patterns['recursion_errors']:
-        logging.warning(f"Detected recursion errors in: {patterns['recursion_errors']}")
+        log.warning(f"Detected recursion errors in: {patterns['recursion_errors']}")
     if patterns['timeout_errors']:
-        logging.warning(f"Detected timeout errors in: {patterns['timeout_errors']}")
+        log.warning(f"Detected timeout errors in: {patterns['timeout_errors']}")
 
-    logging.info("Download process finished.")
+    log.info("Download process finished.")
+    flush_logging()
 
 
 # Generic step runner to avoid duplicate log lines
 def _run_step(start_msg, runner, cfg, end_msg):
-    logging.info(start_msg)
+    log.info(start_msg)
     runner(cfg)
-    logging.info(end_msg)
+    log.info(end_msg)
+    flush_logging()
 
 
 def main():
@@ -269,7 +276,7 @@ def main():
         logging.getLogger(name).setLevel(logging.ERROR)
 
     # 3) proceed with ETL; all modules just use logging.getLogger(__name__)
-    logging.info("Starting ETL process...")
+    log.info("Starting ETL process...")
 
     ensure_workspaces(cfg)
 
@@ -280,7 +287,7 @@ def main():
         # Remove existing geodatabase
         success = remove_geodatabase_safely(staging_gdb_path)
         if not success:
-            logging.warning("Geodatabase removal had issues, but continuing...")
+            log.warning("Geodatabase removal had issues, but continuing...")
 
         # Create fresh geodatabase
         if not create_clean_staging_gdb(staging_gdb_path):
@@ -299,8 +306,12 @@ def main():
         from etl import load_sde
         _run_step("Starting SDE loading process...", load_sde.run, cfg, "SDE loading process finished.")
 
-    logging.info("ETL process finished successfully.")
+    log.info("ETL process finished successfully.")
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        # Drains the log queue (if enabled) and flushes buffered file handlers
+        shutdown_logging()
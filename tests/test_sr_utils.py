@@ -0,0 +1,35 @@
+import pytest
+
+from etl import sr_utils
+from etl.sr_utils import SWEREF99_TM, WGS84_DD, validate_coordinate_array
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(sr_utils, "np", None)
+    return request.param
+
+
+def test_flat_pair_is_one_row(backend):
+    ok, mask = validate_coordinate_array([650000.0, 6600000.0], SWEREF99_TM)
+    assert ok
+    assert list(mask) == [False]
+
+    ok, mask = validate_coordinate_array([17.0, 1000.0], WGS84_DD)
+    assert not ok
+    assert list(mask) == [True]
+
+
+def test_rows_flag_offending_pairs(backend):
+    ok, mask = validate_coordinate_array([[650000.0, 6600000.0, 3.0], [17.0, 59.0, 3.0]], SWEREF99_TM)
+    assert not ok
+    assert list(mask) == [False, True]
+
+
+def test_empty_input_is_valid(backend):
+    ok, mask = validate_coordinate_array([], SWEREF99_TM)
+    assert ok
+    assert len(mask) == 0